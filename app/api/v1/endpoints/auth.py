@@ -1,4 +1,9 @@
+import time
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
@@ -11,24 +16,48 @@ from app.schemas.auth import (
 )
 from app.core.auth import (
     verify_password,
+    password_needs_rehash,
+    get_password_hash,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    DUMMY_PASSWORD_HASH,
     get_current_user,
+    get_token_payload,
+    security,
 )
 from app.models.user import User
 
 router = APIRouter()
 
+# Built once at import; 2.0-style statements hit SQLAlchemy's compiled-SQL
+# cache so the hot login lookup skips per-request statement compilation
+_SELECT_USER_BY_EMAIL = select(User).where(func.lower(User.email) == bindparam("email"))
+
+# Expiry config is constant; convert it once instead of per login/refresh
+_EXPIRE_MINUTES = int(ACCESS_TOKEN_EXPIRE_MINUTES)
+_EXPIRE_DELTA = timedelta(minutes=_EXPIRE_MINUTES)
+_EXPIRES_IN_SECONDS = _EXPIRE_MINUTES * 60
+
+# Don't bother re-signing a token that still has most of its life left
+_REFRESH_THRESHOLD_SECONDS = _EXPIRES_IN_SECONDS // 2
+
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """
     Login endpoint - autentikasi user dengan email dan password
     """
-    # Cari user berdasarkan email (case insensitive)
-    user = db.query(User).filter(User.email.ilike(login_data.email)).first()
+    # Cari user berdasarkan email (case insensitive, pakai index lower(email))
+    user = (
+        db.execute(_SELECT_USER_BY_EMAIL, {"email": login_data.email.lower()})
+        .scalars()
+        .first()
+    )
 
     if not user:
+        # Burn the same bcrypt cost as a real verification so response time
+        # doesn't leak whether the email exists
+        verify_password(login_data.password, DUMMY_PASSWORD_HASH)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
@@ -39,54 +68,74 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
 
+    # Upgrade transparan: hash bcrypt lama (atau parameter argon2 usang)
+    # di-rehash dengan skema terkini saat login berhasil
+    if password_needs_rehash(user.password):
+        user.password = get_password_hash(login_data.password)
+        db.commit()
+
     # Buat access token
-    access_token_expires = timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES))
     access_token = create_access_token(
         data={"sub": str(user.id), "email": user.email},
-        expires_delta=access_token_expires,
+        expires_delta=_EXPIRE_DELTA,
     )
 
     return LoginResponse(
         access_token=access_token,
         token_type="bearer",
-        expires_in=int(ACCESS_TOKEN_EXPIRE_MINUTES) * 60,  # dalam detik
+        expires_in=_EXPIRES_IN_SECONDS,  # dalam detik
         user=user.to_dict(),
     )
 
 
 @router.post("/logout", response_model=LogoutResponse)
-async def logout(current_user: User = Depends(get_current_user)):
+def logout(current_user: User = Depends(get_current_user)):
     return LogoutResponse(message="Successfully logged out", success=True)
 
 
 @router.post("/refresh", response_model=RefreshTokenResponse)
-async def refresh_token(current_user: User = Depends(get_current_user)):
+def refresh_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    payload: dict = Depends(get_token_payload),
+    current_user: User = Depends(get_current_user),
+):
     """
     Refresh access token using current valid token
     """
+    # Token masih segar: kembalikan apa adanya, hemat satu HMAC signing
+    remaining = int(payload["exp"] - time.time())
+    if remaining > _REFRESH_THRESHOLD_SECONDS:
+        return RefreshTokenResponse(
+            access_token=credentials.credentials,
+            token_type="bearer",
+            expires_in=remaining,
+        )
+
     # Buat access token baru
-    access_token_expires = timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES))
     access_token = create_access_token(
         data={"sub": str(current_user.id), "email": current_user.email},
-        expires_delta=access_token_expires,
+        expires_delta=_EXPIRE_DELTA,
     )
 
     return RefreshTokenResponse(
         access_token=access_token,
         token_type="bearer",
-        expires_in=int(ACCESS_TOKEN_EXPIRE_MINUTES) * 60,  # dalam detik
+        expires_in=_EXPIRES_IN_SECONDS,  # dalam detik
     )
 
 
 @router.get("/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
     Get current authenticated user information
     """
-    return {
-        "id": current_user.id,
-        "name": current_user.name,
-        "email": current_user.email,
-        "created_at": current_user.created_at,
-        "updated_at": current_user.updated_at,
-    }
+    # Plain dict through orjson; nothing here needs Pydantic revalidation
+    return ORJSONResponse(
+        {
+            "id": current_user.id,
+            "name": current_user.name,
+            "email": current_user.email,
+            "created_at": current_user.created_at,
+            "updated_at": current_user.updated_at,
+        }
+    )
@@ -1,33 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.models.category import Category
+from app.models.document import Document
 from app.schemas.category import CategoryResponse, CategoryCreate, CategoryUpdate
 from app.config.database import get_db
 from app.core.auth import get_current_user
+from app.core.cache import TTLCache
 from app.models.user import User
 
 router = APIRouter()
 
+# Precompiled 2.0-style statement for the hot by-id lookup
+_SELECT_CATEGORY_BY_ID = select(Category).where(Category.id == bindparam("category_id"))
+
+# Categories change rarely; serve repeat by-id reads from process memory
+_category_cache = TTLCache(maxsize=1024, ttl=60)
+
 
 @router.get("/", response_model=List[CategoryResponse])
-async def get_categories(
+def get_categories(
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     GET /api/v1/categories/
-    Mendapatkan daftar semua categories dengan pagination
+    Mendapatkan daftar semua categories dengan pagination.
+
+    Kirim after_id (id terakhir dari halaman sebelumnya) untuk keyset
+    pagination; OFFSET makin mahal seiring dalamnya halaman.
     """
-    categories = db.query(Category).offset(skip).limit(limit).all()
+    query = db.query(Category).order_by(Category.id)
+
+    if after_id is not None:
+        categories = query.filter(Category.id > after_id).limit(limit).all()
+    else:
+        categories = query.offset(skip).limit(limit).all()
+
     return categories
 
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-async def create_category(
+def create_category(
     category_data: CategoryCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -36,11 +55,11 @@ async def create_category(
     POST /api/v1/categories/
     Membuat category baru
     """
-    # Check apakah nama category sudah ada
-    existing_category = (
-        db.query(Category).filter(Category.name == category_data.name).first()
-    )
-    if existing_category:
+    # Check apakah nama category sudah ada (EXISTS berhenti di baris pertama)
+    name_taken = db.query(
+        db.query(Category).filter(Category.name == category_data.name).exists()
+    ).scalar()
+    if name_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category name already exists",
@@ -50,13 +69,12 @@ async def create_category(
     new_category = Category(**category_data.dict())
     db.add(new_category)
     db.commit()
-    db.refresh(new_category)
 
     return new_category
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-async def get_category(
+def get_category(
     category_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -65,18 +83,27 @@ async def get_category(
     GET /api/v1/categories/{id}
     Mendapatkan detail category berdasarkan ID
     """
-    category = db.query(Category).filter(Category.id == category_id).first()
+    cached = _category_cache.get(category_id)
+    if cached is not None:
+        return cached
+
+    category = (
+        db.execute(_SELECT_CATEGORY_BY_ID, {"category_id": category_id})
+        .scalars()
+        .first()
+    )
 
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
         )
 
+    _category_cache.set(category_id, category.to_dict())
     return category
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-async def update_category(
+def update_category(
     category_id: int,
     category_data: CategoryUpdate,
     db: Session = Depends(get_db),
@@ -86,39 +113,45 @@ async def update_category(
     PUT /api/v1/categories/{id}
     Update data category berdasarkan ID
     """
-    category = db.query(Category).filter(Category.id == category_id).first()
-
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
-        )
-
     # Check nama category tidak duplicate (kecuali dengan dirinya sendiri)
     if category_data.name:
-        existing_category = (
+        name_taken = db.query(
             db.query(Category)
             .filter(Category.name == category_data.name, Category.id != category_id)
-            .first()
-        )
-        if existing_category:
+            .exists()
+        ).scalar()
+        if name_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category name already exists",
             )
 
-    # Update fields yang dikirim
+    # Single UPDATE; rowcount 0 berarti category tidak ditemukan
     update_data = category_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(category, field, value)
+    if update_data:
+        updated = (
+            db.query(Category)
+            .filter(Category.id == category_id)
+            .update(update_data, synchronize_session=False)
+        )
+        if not updated:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
+            )
+        db.commit()
+        _category_cache.pop(category_id)
 
-    db.commit()
-    db.refresh(category)
+    category = db.query(Category).filter(Category.id == category_id).first()
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
+        )
 
     return category
 
 
 @router.delete("/{category_id}")
-async def delete_category(
+def delete_category(
     category_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -135,19 +168,18 @@ async def delete_category(
         )
 
     # Check apakah category masih digunakan oleh documents
-    from app.models.document import Document
-
-    documents_count = (
-        db.query(Document).filter(Document.category_id == category_id).count()
-    )
-    if documents_count > 0:
+    in_use = db.query(
+        db.query(Document).filter(Document.category_id == category_id).exists()
+    ).scalar()
+    if in_use:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot delete category. {documents_count} documents still using this category",
+            detail="Cannot delete category. Documents still using this category",
         )
 
     db.delete(category)
     db.commit()
+    _category_cache.pop(category_id)
 
     return {
         "message": "Category deleted successfully",
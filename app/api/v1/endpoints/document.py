@@ -1,61 +1,97 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.models.category import Category
 from app.models.document import Document
 from app.models.user import User
 from app.schemas.document import DocumentResponse, DocumentCreate, DocumentUpdate
 from app.config.database import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, get_token_user, TokenUser
+from app.core.cache import TTLCache
 
 router = APIRouter()
 
+# Precompiled 2.0-style statement for the hot by-id lookup
+_SELECT_DOCUMENT_BY_ID = select(Document).where(Document.id == bindparam("document_id"))
+
+# Documents change more often than categories, so keep the TTL short
+_document_cache = TTLCache(maxsize=1024, ttl=15)
+
+# Columns that DocumentResponse actually serializes; selecting them directly
+# returns lightweight Row tuples instead of fully hydrated ORM entities
+_DOCUMENT_LIST_COLUMNS = (
+    Document.id,
+    Document.title,
+    Document.code,
+    Document.category_id,
+    Document.uploaded_by,
+    Document.is_active,
+    Document.created_at,
+    Document.updated_at,
+)
+
 
 @router.get("/", response_model=List[DocumentResponse])
-async def get_documents(
+def get_documents(
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = None,
     category_id: Optional[int] = None,
     is_active: Optional[bool] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(Document)
+    query = db.query(*_DOCUMENT_LIST_COLUMNS)
 
     if category_id is not None:
         query = query.filter(Document.category_id == category_id)
     if is_active is not None:
         query = query.filter(Document.is_active == is_active)
 
-    documents = query.offset(skip).limit(limit).all()
-    return documents
+    query = query.order_by(Document.id)
+
+    # Keyset pagination: pass the last id of the previous page as after_id;
+    # OFFSET has to scan and discard skip rows, the keyset stays O(log n)
+    if after_id is not None:
+        documents = query.filter(Document.id > after_id).limit(limit).all()
+    else:
+        documents = query.offset(skip).limit(limit).all()
+
+    # Rows already match the response schema; serialize them straight through
+    # orjson instead of paying Pydantic validation per row
+    return ORJSONResponse([dict(row._mapping) for row in documents])
 
 
 @router.post("/", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
-async def create_document(
+def create_document(
     document_data: DocumentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
 ):
-    existing_document = (
-        db.query(Document).filter(Document.code == document_data.code).first()
+    # Validate code uniqueness and FK existence in one round trip
+    code_exists = (
+        db.query(Document).filter(Document.code == document_data.code).exists()
     )
-    if existing_document:
+    if document_data.category_id:
+        category_exists = (
+            db.query(Category).filter(Category.id == document_data.category_id).exists()
+        )
+        code_taken, category_ok = db.query(code_exists, category_exists).one()
+    else:
+        code_taken, category_ok = db.query(code_exists).scalar(), True
+
+    if code_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Document code already exists",
         )
-
-    if document_data.category_id:
-        from app.models.category import Category
-
-        category = (
-            db.query(Category).filter(Category.id == document_data.category_id).first()
+    if not category_ok:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Category not found"
         )
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Category not found"
-            )
 
     document_dict = document_data.dict()
     document_dict["uploaded_by"] = current_user.id
@@ -63,76 +99,89 @@ async def create_document(
     new_document = Document(**document_dict)
     db.add(new_document)
     db.commit()
-    db.refresh(new_document)
 
     return new_document
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
-async def get_document(
+def get_document(
     document_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    document = db.query(Document).filter(Document.id == document_id).first()
+    cached = _document_cache.get(document_id)
+    if cached is not None:
+        return cached
+
+    document = (
+        db.execute(_SELECT_DOCUMENT_BY_ID, {"document_id": document_id})
+        .scalars()
+        .first()
+    )
 
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
         )
 
+    _document_cache.set(document_id, document.to_dict())
     return document
 
 
 @router.put("/{document_id}", response_model=DocumentResponse)
-async def update_document(
+def update_document(
     document_id: int,
     document_data: DocumentUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    document = db.query(Document).filter(Document.id == document_id).first()
-
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
-        )
-
     if document_data.code:
-        existing_document = (
+        code_taken = db.query(
             db.query(Document)
             .filter(Document.code == document_data.code, Document.id != document_id)
-            .first()
-        )
-        if existing_document:
+            .exists()
+        ).scalar()
+        if code_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Document code already exists",
             )
 
     if document_data.category_id:
-        from app.models.category import Category
-
-        category = (
-            db.query(Category).filter(Category.id == document_data.category_id).first()
-        )
-        if not category:
+        category_exists = db.query(
+            db.query(Category).filter(Category.id == document_data.category_id).exists()
+        ).scalar()
+        if not category_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Category not found"
             )
 
+    # Single UPDATE; rowcount 0 means the document doesn't exist
     update_data = document_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(document, field, value)
+    if update_data:
+        updated = (
+            db.query(Document)
+            .filter(Document.id == document_id)
+            .update(update_data, synchronize_session=False)
+        )
+        if not updated:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+            )
+        db.commit()
+        _document_cache.pop(document_id)
 
-    db.commit()
-    db.refresh(document)
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+        )
 
     return document
 
 
 @router.delete("/{document_id}")
-async def delete_document(
+def delete_document(
     document_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -146,6 +195,7 @@ async def delete_document(
 
     db.delete(document)
     db.commit()
+    _document_cache.pop(document_id)
 
     return {
         "message": "Document deleted successfully",
@@ -154,7 +204,7 @@ async def delete_document(
 
 
 @router.get("/{document_id}/revisions")
-async def get_document_revisions(
+def get_document_revisions(
     document_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 
 from app.models.document import Document, DocumentHistory, DocumentRevision
 from app.models.user import User
@@ -11,22 +14,41 @@ from app.schemas.document import (
     HistoryAction,
 )
 from app.config.database import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, get_token_user, TokenUser
 
 router = APIRouter()
 
+# Precompiled 2.0-style statement for the hot by-id lookup
+_SELECT_HISTORY_BY_ID = select(DocumentHistory).where(
+    DocumentHistory.id == bindparam("history_id")
+)
+
+# Columns that DocumentHistoryResponse actually serializes; selecting them
+# directly returns lightweight Row tuples instead of hydrated ORM entities
+_HISTORY_LIST_COLUMNS = (
+    DocumentHistory.id,
+    DocumentHistory.document_id,
+    DocumentHistory.revision_id,
+    DocumentHistory.action,
+    DocumentHistory.performed_by,
+    DocumentHistory.reason,
+    DocumentHistory.created_at,
+    DocumentHistory.updated_at,
+)
+
 
 @router.get("/", response_model=List[DocumentHistoryResponse])
-async def get_all_history(
+def get_all_history(
     skip: int = 0,
     limit: int = 100,
+    before_created_at: Optional[datetime] = None,
     document_id: Optional[int] = None,
     action: Optional[HistoryAction] = None,
     performed_by: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(DocumentHistory)
+    query = db.query(*_HISTORY_LIST_COLUMNS)
 
     if document_id is not None:
         query = query.filter(DocumentHistory.document_id == document_id)
@@ -35,45 +57,60 @@ async def get_all_history(
     if performed_by is not None:
         query = query.filter(DocumentHistory.performed_by == performed_by)
 
-    history = (
-        query.order_by(DocumentHistory.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = query.order_by(DocumentHistory.created_at.desc())
+
+    # Keyset pagination: pass the last row's created_at as before_created_at
+    # so deep pages don't pay for OFFSET scanning discarded rows
+    if before_created_at is not None:
+        history = (
+            query.filter(DocumentHistory.created_at < before_created_at)
+            .limit(limit)
+            .all()
+        )
+    else:
+        history = query.offset(skip).limit(limit).all()
+
+    # Rows already match the response schema; serialize them straight through
+    # orjson instead of paying Pydantic validation per row
+    return ORJSONResponse(
+        [dict(row._mapping, action=row.action.value) for row in history]
     )
-    return history
 
 
 @router.post(
     "/", response_model=DocumentHistoryResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_history(
+def create_history(
     history_data: DocumentHistoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
 ):
-    document = (
-        db.query(Document).filter(Document.id == history_data.document_id).first()
+    # Validate document and revision FKs in one round trip
+    document_exists = (
+        db.query(Document).filter(Document.id == history_data.document_id).exists()
     )
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
-        )
-
     if history_data.revision_id:
-        revision = (
+        revision_exists = (
             db.query(DocumentRevision)
             .filter(
                 DocumentRevision.id == history_data.revision_id,
                 DocumentRevision.document_id == history_data.document_id,
             )
-            .first()
+            .exists()
+        )
+        document_ok, revision_ok = db.query(document_exists, revision_exists).one()
+    else:
+        document_ok, revision_ok = db.query(document_exists).scalar(), True
+
+    if not document_ok:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+        )
+    if not revision_ok:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Revision not found or doesn't belong to this document",
         )
-        if not revision:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Revision not found or doesn't belong to this document",
-            )
 
     history_dict = history_data.dict()
     history_dict["performed_by"] = current_user.id
@@ -81,18 +118,21 @@ async def create_history(
     new_history = DocumentHistory(**history_dict)
     db.add(new_history)
     db.commit()
-    db.refresh(new_history)
 
     return new_history
 
 
 @router.get("/{history_id}", response_model=DocumentHistoryResponse)
-async def get_history(
+def get_history(
     history_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    history = db.query(DocumentHistory).filter(DocumentHistory.id == history_id).first()
+    history = (
+        db.execute(_SELECT_HISTORY_BY_ID, {"history_id": history_id})
+        .scalars()
+        .first()
+    )
 
     if not history:
         raise HTTPException(
@@ -103,46 +143,64 @@ async def get_history(
 
 
 @router.put("/{history_id}", response_model=DocumentHistoryResponse)
-async def update_history(
+def update_history(
     history_id: int,
     history_data: DocumentHistoryUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    history = db.query(DocumentHistory).filter(DocumentHistory.id == history_id).first()
-
-    if not history:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Document history not found"
+    if history_data.revision_id is not None:
+        document_id = (
+            db.query(DocumentHistory.document_id)
+            .filter(DocumentHistory.id == history_id)
+            .scalar()
         )
+        if document_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document history not found",
+            )
 
-    if history_data.revision_id is not None:
-        revision = (
+        revision_ok = db.query(
             db.query(DocumentRevision)
             .filter(
                 DocumentRevision.id == history_data.revision_id,
-                DocumentRevision.document_id == history.document_id,
+                DocumentRevision.document_id == document_id,
             )
-            .first()
-        )
-        if not revision:
+            .exists()
+        ).scalar()
+        if not revision_ok:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Revision not found or doesn't belong to this document",
             )
 
+    # Single UPDATE; rowcount 0 means the history entry doesn't exist
     update_data = history_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(history, field, value)
+    if update_data:
+        updated = (
+            db.query(DocumentHistory)
+            .filter(DocumentHistory.id == history_id)
+            .update(update_data, synchronize_session=False)
+        )
+        if not updated:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document history not found",
+            )
+        db.commit()
 
-    db.commit()
-    db.refresh(history)
+    history = db.query(DocumentHistory).filter(DocumentHistory.id == history_id).first()
+    if not history:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document history not found"
+        )
 
     return history
 
 
 @router.delete("/{history_id}")
-async def delete_history(
+def delete_history(
     history_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -164,10 +222,11 @@ async def delete_history(
 
 
 @router.get("/document/{document_id}", response_model=List[DocumentHistoryResponse])
-async def get_history_by_document(
+def get_history_by_document(
     document_id: int,
     skip: int = 0,
     limit: int = 100,
+    before_created_at: Optional[datetime] = None,
     action: Optional[HistoryAction] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -178,28 +237,39 @@ async def get_history_by_document(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
         )
 
-    query = db.query(DocumentHistory).filter(DocumentHistory.document_id == document_id)
+    query = db.query(*_HISTORY_LIST_COLUMNS).filter(
+        DocumentHistory.document_id == document_id
+    )
 
     if action is not None:
         query = query.filter(DocumentHistory.action == action)
 
-    history = (
-        query.order_by(DocumentHistory.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = query.order_by(DocumentHistory.created_at.desc())
+
+    if before_created_at is not None:
+        history = (
+            query.filter(DocumentHistory.created_at < before_created_at)
+            .limit(limit)
+            .all()
+        )
+    else:
+        history = query.offset(skip).limit(limit).all()
+
+    # Rows already match the response schema; serialize them straight through
+    # orjson instead of paying Pydantic validation per row
+    return ORJSONResponse(
+        [dict(row._mapping, action=row.action.value) for row in history]
     )
-    return history
 
 
 @router.post("/log", response_model=DocumentHistoryResponse)
-async def log_action(
+def log_action(
     document_id: int,
     action: HistoryAction,
     revision_id: Optional[int] = None,
     reason: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
 ):
     document = db.query(Document).filter(Document.id == document_id).first()
     if not document:
@@ -217,44 +287,40 @@ async def log_action(
 
     db.add(new_history)
     db.commit()
-    db.refresh(new_history)
 
     return new_history
 
 
 @router.get("/analytics/summary")
-async def get_history_summary(
+def get_history_summary(
     document_id: Optional[int] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    from sqlalchemy import func
+    start_dt = datetime.fromisoformat(start_date) if start_date else None
+    end_dt = datetime.fromisoformat(end_date) if end_date else None
 
+    # Per-action counts plus the grand total via a window over the groups,
+    # so everything comes back in one round trip
     query = db.query(
-        DocumentHistory.action, func.count(DocumentHistory.id).label("count")
+        DocumentHistory.action,
+        func.count(DocumentHistory.id).label("count"),
+        func.sum(func.count(DocumentHistory.id)).over().label("total"),
     )
 
     if document_id:
         query = query.filter(DocumentHistory.document_id == document_id)
-
-    if start_date:
-        from datetime import datetime
-
-        start_dt = datetime.fromisoformat(start_date)
+    if start_dt:
         query = query.filter(DocumentHistory.created_at >= start_dt)
-
-    if end_date:
-        from datetime import datetime
-
-        end_dt = datetime.fromisoformat(end_date)
+    if end_dt:
         query = query.filter(DocumentHistory.created_at <= end_dt)
 
     results = query.group_by(DocumentHistory.action).all()
 
     summary = {
-        "total_actions": sum(r.count for r in results),
+        "total_actions": int(results[0].total) if results else 0,
         "actions_breakdown": {r.action.value: r.count for r in results},
     }
 
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload
 from typing import List, Optional
 
 from app.models.document import Document, DocumentRevision
@@ -17,7 +17,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[DocumentRevisionResponse])
-async def get_all_revisions(
+def get_all_revisions(
     skip: int = 0,
     limit: int = 100,
     document_id: Optional[int] = None,
@@ -29,7 +29,9 @@ async def get_all_revisions(
     GET /api/v1/document-revisions/
     Mendapatkan daftar semua document revisions dengan filtering
     """
-    query = db.query(DocumentRevision)
+    # Response hanya berisi kolom skalar; raiseload membuat lazy-load
+    # relationship yang tidak disengaja langsung gagal (guard anti N+1)
+    query = db.query(DocumentRevision).options(raiseload("*"))
 
     # Filtering
     if document_id is not None:
@@ -44,7 +46,7 @@ async def get_all_revisions(
 @router.post(
     "/", response_model=DocumentRevisionResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_revision(
+def create_revision(
     revision_data: DocumentRevisionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -53,44 +55,44 @@ async def create_revision(
     POST /api/v1/document-revisions/
     Membuat document revision baru
     """
-    # Check apakah document exists
-    document = (
-        db.query(Document).filter(Document.id == revision_data.document_id).first()
+    # Check document + duplicate revision_number via EXISTS dalam satu round trip
+    document_exists = (
+        db.query(Document).filter(Document.id == revision_data.document_id).exists()
     )
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
-        )
-
-    # Check apakah revision_number sudah ada untuk document ini
-    existing_revision = (
+    revision_exists = (
         db.query(DocumentRevision)
         .filter(
             DocumentRevision.document_id == revision_data.document_id,
             DocumentRevision.revision_number == revision_data.revision_number,
         )
-        .first()
+        .exists()
     )
-    if existing_revision:
+    document_ok, revision_taken = db.query(document_exists, revision_exists).one()
+
+    if not document_ok:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+        )
+    if revision_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Revision number {revision_data.revision_number} already exists for this document",
         )
 
-    # Create revision baru
-    revision_dict = revision_data.dict()
-    revision_dict["revised_by"] = current_user.id  # Set reviser ke user yang login
-
-    new_revision = DocumentRevision(**revision_dict)
+    # Create revision baru; model_dump (fast path v2) + revised_by langsung
+    # sebagai kwarg, tanpa dict perantara
+    new_revision = DocumentRevision(
+        **revision_data.model_dump(), revised_by=current_user.id
+    )
     db.add(new_revision)
+    # expire_on_commit=False plus client-side defaults: no refresh needed
     db.commit()
-    db.refresh(new_revision)
 
     return new_revision
 
 
 @router.get("/{revision_id}", response_model=DocumentRevisionResponse)
-async def get_revision(
+def get_revision(
     revision_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -112,7 +114,7 @@ async def get_revision(
 
 
 @router.put("/{revision_id}", response_model=DocumentRevisionResponse)
-async def update_revision(
+def update_revision(
     revision_id: int,
     revision_data: DocumentRevisionUpdate,
     db: Session = Depends(get_db),
@@ -137,15 +139,15 @@ async def update_revision(
 
     # Check revision_number tidak duplicate (jika diupdate)
     if revision_data.revision_number is not None:
-        existing_revision = (
+        existing_revision = db.query(
             db.query(DocumentRevision)
             .filter(
                 DocumentRevision.document_id == revision.document_id,
                 DocumentRevision.revision_number == revision_data.revision_number,
                 DocumentRevision.id != revision_id,
             )
-            .first()
-        )
+            .exists()
+        ).scalar()
         if existing_revision:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -153,18 +155,17 @@ async def update_revision(
             )
 
     # Update fields yang dikirim
-    update_data = revision_data.dict(exclude_unset=True)
+    update_data = revision_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(revision, field, value)
 
     db.commit()
-    db.refresh(revision)
 
     return revision
 
 
 @router.delete("/{revision_id}")
-async def delete_revision(
+def delete_revision(
     revision_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -197,7 +198,7 @@ async def delete_revision(
 
 # Nested endpoint: Get revisions for specific document
 @router.get("/document/{document_id}", response_model=List[DocumentRevisionResponse])
-async def get_revisions_by_document(
+def get_revisions_by_document(
     document_id: int,
     skip: int = 0,
     limit: int = 100,
@@ -209,15 +210,17 @@ async def get_revisions_by_document(
     GET /api/v1/document-revisions/document/{document_id}
     Mendapatkan semua revisions dari document tertentu
     """
-    # Check document exists
-    document = db.query(Document).filter(Document.id == document_id).first()
-    if not document:
+    # Check document exists (EXISTS, no need to hydrate the row)
+    document_exists = db.query(
+        db.query(Document).filter(Document.id == document_id).exists()
+    ).scalar()
+    if not document_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
         )
 
-    # Get revisions
-    query = db.query(DocumentRevision).filter(
+    # Get revisions (raiseload: guard anti N+1, response hanya kolom skalar)
+    query = db.query(DocumentRevision).options(raiseload("*")).filter(
         DocumentRevision.document_id == document_id
     )
 
@@ -235,7 +238,7 @@ async def get_revisions_by_document(
 
 # Status management endpoints
 @router.patch("/{revision_id}/status", response_model=DocumentRevisionResponse)
-async def update_revision_status(
+def update_revision_status(
     revision_id: int,
     new_status: RevisionStatus,
     db: Session = Depends(get_db),
@@ -245,34 +248,42 @@ async def update_revision_status(
     PATCH /api/v1/document-revisions/{id}/status
     Update status document revision (approve/reject/etc)
     """
-    revision = (
-        db.query(DocumentRevision).filter(DocumentRevision.id == revision_id).first()
+    # Satu conditional UPDATE menggantikan pola SELECT-lalu-UPDATE; guard
+    # status APPROVED masuk ke WHERE sehingga tidak ada race read-modify-write
+    query = db.query(DocumentRevision).filter(DocumentRevision.id == revision_id)
+    if new_status != RevisionStatus.APPROVED:
+        query = query.filter(DocumentRevision.status != RevisionStatus.APPROVED)
+
+    updated = query.update(
+        {DocumentRevision.status: new_status}, synchronize_session=False
     )
 
-    if not revision:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Document revision not found"
-        )
-
-    # Business logic untuk status transition
-    if (
-        revision.status == RevisionStatus.APPROVED
-        and new_status != RevisionStatus.APPROVED
-    ):
+    if not updated:
+        # Rowcount 0: bedakan revision hilang (404) dari guard yang menolak (400)
+        exists = db.query(
+            db.query(DocumentRevision)
+            .filter(DocumentRevision.id == revision_id)
+            .exists()
+        ).scalar()
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document revision not found",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot change status of already approved revision",
         )
 
-    revision.status = new_status
     db.commit()
-    db.refresh(revision)
 
-    return revision
+    return (
+        db.query(DocumentRevision).filter(DocumentRevision.id == revision_id).first()
+    )
 
 
 @router.get("/document/{document_id}/latest", response_model=DocumentRevisionResponse)
-async def get_latest_revision(
+def get_latest_revision(
     document_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -281,22 +292,23 @@ async def get_latest_revision(
     GET /api/v1/document-revisions/document/{document_id}/latest
     Mendapatkan revision terbaru dari document tertentu
     """
-    # Check document exists
-    document = db.query(Document).filter(Document.id == document_id).first()
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
-        )
-
-    # Get latest revision
-    latest_revision = (
-        db.query(DocumentRevision)
-        .filter(DocumentRevision.document_id == document_id)
+    # Satu LEFT JOIN: row None berarti document tidak ada, kolom revision
+    # NULL berarti document ada tapi belum punya revision
+    row = (
+        db.query(Document.id, DocumentRevision)
+        .outerjoin(DocumentRevision, DocumentRevision.document_id == Document.id)
+        .filter(Document.id == document_id)
         .order_by(DocumentRevision.revision_number.desc())
         .first()
     )
 
-    if not latest_revision:
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+        )
+
+    latest_revision = row[1]
+    if latest_revision is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No revisions found for this document",
@@ -1,20 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import math
-import json
-import uuid
+from datetime import datetime
+
+import orjson
 
 from app.core.auth import get_current_user
-from app.config.database import get_db
+from app.core.cache import TTLCache
+from app.config.database import SessionLocal, get_db
 from app.models.user import User
-from app.models.notification import Notification
+from app.models.notification import Notification, uuid7
 from app.schemas.notification import (
     NotificationCreate,
     NotificationUpdate,
     NotificationResponse,
     NotificationWithParsedData,
-    NotificationListResponse,
     NotificationStatsResponse,
     BulkNotificationMarkRead,
     BulkNotificationDelete,
@@ -27,6 +29,71 @@ from app.schemas.notification import (
 
 router = APIRouter()
 
+# Unread badge counts and the stats breakdown are polled constantly but only
+# change on writes; a short TTL plus explicit invalidation keeps them out of
+# the database
+_unread_cache = TTLCache(maxsize=4096, ttl=15)
+_stats_cache = TTLCache(maxsize=4096, ttl=15)
+
+
+def _invalidate_user_caches(user_id: int):
+    _unread_cache.pop(user_id)
+    _stats_cache.pop(user_id)
+
+
+# Built once; the Core statement skips ORM unit-of-work bookkeeping for
+# rows nothing ever reads back as objects
+_NOTIFICATIONS_INSERT = Notification.__table__.insert()
+
+
+def _insert_notifications(rows, user_ids):
+    """Tulis batch notifikasi di background dengan session sendiri."""
+    db = SessionLocal()
+    try:
+        db.execute(_NOTIFICATIONS_INSERT, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    for user_id in user_ids:
+        _invalidate_user_caches(user_id)
+
+
+def _list_response(notifications, total, unread_count, page, per_page):
+    """Serialize a notification page straight to ORJSONResponse.
+
+    The list rows are already plain scalars via to_dict(), so running them
+    through response_model validation plus jsonable_encoder would only
+    re-check and re-copy every field; building the response directly skips
+    both on the hottest read path.
+    """
+    return ORJSONResponse(
+        content={
+            "notifications": [
+                {**n.to_dict(), "is_read": n.read_at is not None}
+                for n in notifications
+            ],
+            "total": total,
+            "unread_count": unread_count,
+            "page": page,
+            "per_page": per_page,
+            # Ceiling division tanpa float; per_page tervalidasi >= 1
+            "total_pages": -(-total // per_page),
+        }
+    )
+
+
+def _get_unread_count(db: Session, user_id: int) -> int:
+    cached = _unread_cache.get(user_id)
+    if cached is not None:
+        return cached
+    count = Notification.count_unread_by_user(db, user_id)
+    _unread_cache.set(user_id, count)
+    return count
+
 
 @router.post(
     "/", response_model=NotificationResponse, summary="Create new notification"
@@ -43,13 +110,15 @@ def create_notification(
     - **notifiable_id**: User ID who will receive the notification
     - **data**: Notification data as JSON object or string
     """
-    # Verify target user exists
-    target_user = db.query(User).filter(User.id == notification.notifiable_id).first()
-    if not target_user:
+    # Verify target user exists (EXISTS, no need to hydrate the row)
+    user_exists = db.query(
+        db.query(User).filter(User.id == notification.notifiable_id).exists()
+    ).scalar()
+    if not user_exists:
         raise HTTPException(status_code=404, detail="Target user not found")
 
     # Generate UUID if not provided
-    notification_id = notification.id or str(uuid.uuid4())
+    notification_id = notification.id or uuid7()
 
     db_notification = Notification(
         id=notification_id,
@@ -60,15 +129,16 @@ def create_notification(
     )
 
     db.add(db_notification)
+    # expire_on_commit=False plus client-side defaults: no refresh needed
     db.commit()
-    db.refresh(db_notification)
+
+    _invalidate_user_caches(notification.notifiable_id)
 
     return db_notification
 
 
 @router.get(
     "/my",
-    response_model=NotificationListResponse,
     summary="Get current user's notifications",
 )
 def get_my_notifications(
@@ -91,6 +161,15 @@ def get_my_notifications(
     """
     skip = (page - 1) * per_page
 
+    if is_read is None and not type:
+        # Unfiltered inbox: one windowed query returns the page plus both
+        # counts (see Notification.get_inbox_page)
+        notifications, total, unread_count = Notification.get_inbox_page(
+            db, current_user.id, skip, per_page
+        )
+        _unread_cache.set(current_user.id, unread_count)
+        return _list_response(notifications, total, unread_count, page, per_page)
+
     query = db.query(Notification).filter(Notification.notifiable_id == current_user.id)
 
     # Apply filters
@@ -103,32 +182,28 @@ def get_my_notifications(
     if type:
         query = query.filter(Notification.type == type)
 
-    # Get notifications dengan pagination
-    notifications = (
-        query.order_by(Notification.created_at.desc())
+    # Fetch the page plus the windowed filtered total in one round trip
+    rows = (
+        query.with_entities(
+            Notification,
+            func.count().over().label("total"),
+        )
+        .order_by(Notification.created_at.desc())
         .offset(skip)
         .limit(per_page)
         .all()
     )
+    notifications = [row[0] for row in rows]
+    total = rows[0].total if rows else query.count()
+    # Filters narrow what the window sees, so unread keeps its own
+    # (cached) count
+    unread_count = _get_unread_count(db, current_user.id)
 
-    # Count total dan unread
-    total = query.count()
-    unread_count = Notification.count_unread_by_user(db, current_user.id)
-    total_pages = math.ceil(total / per_page)
-
-    return NotificationListResponse(
-        notifications=notifications,
-        total=total,
-        unread_count=unread_count,
-        page=page,
-        per_page=per_page,
-        total_pages=total_pages,
-    )
+    return _list_response(notifications, total, unread_count, page, per_page)
 
 
 @router.get(
     "/users/{user_id}",
-    response_model=NotificationListResponse,
     summary="Get user's notifications (admin)",
 )
 def get_user_notifications(
@@ -149,13 +224,24 @@ def get_user_notifications(
     - **is_read**: Filter by read status (optional)
     - **type**: Filter by notification type (optional)
     """
-    # Verify target user exists
-    target_user = db.query(User).filter(User.id == user_id).first()
-    if not target_user:
+    # Verify target user exists (EXISTS, no need to hydrate the row)
+    user_exists = db.query(
+        db.query(User).filter(User.id == user_id).exists()
+    ).scalar()
+    if not user_exists:
         raise HTTPException(status_code=404, detail="User not found")
 
     skip = (page - 1) * per_page
 
+    if is_read is None and not type:
+        # Unfiltered inbox: one windowed query returns the page plus both
+        # counts (see Notification.get_inbox_page)
+        notifications, total, unread_count = Notification.get_inbox_page(
+            db, user_id, skip, per_page
+        )
+        _unread_cache.set(user_id, unread_count)
+        return _list_response(notifications, total, unread_count, page, per_page)
+
     query = db.query(Notification).filter(Notification.notifiable_id == user_id)
 
     # Apply filters
@@ -168,27 +254,24 @@ def get_user_notifications(
     if type:
         query = query.filter(Notification.type == type)
 
-    # Get notifications dengan pagination
-    notifications = (
-        query.order_by(Notification.created_at.desc())
+    # Fetch the page plus the windowed filtered total in one round trip
+    rows = (
+        query.with_entities(
+            Notification,
+            func.count().over().label("total"),
+        )
+        .order_by(Notification.created_at.desc())
         .offset(skip)
         .limit(per_page)
         .all()
     )
+    notifications = [row[0] for row in rows]
+    total = rows[0].total if rows else query.count()
+    # Filters narrow what the window sees, so unread keeps its own
+    # (cached) count
+    unread_count = _get_unread_count(db, user_id)
 
-    # Count total dan unread
-    total = query.count()
-    unread_count = Notification.count_unread_by_user(db, user_id)
-    total_pages = math.ceil(total / per_page)
-
-    return NotificationListResponse(
-        notifications=notifications,
-        total=total,
-        unread_count=unread_count,
-        page=page,
-        per_page=per_page,
-        total_pages=total_pages,
-    )
+    return _list_response(notifications, total, unread_count, page, per_page)
 
 
 @router.get(
@@ -203,28 +286,39 @@ def get_my_notification_stats(
     """
     Get current user's notification statistics.
     """
-    total = Notification.count_by_user(db, current_user.id)
-    unread = Notification.count_unread_by_user(db, current_user.id)
-    read = total - unread
-
-    # Get notifications by type count
-    notifications_by_type = {}
-    type_results = (
-        db.query(Notification.type, db.func.count(Notification.id))
+    cached = _stats_cache.get(current_user.id)
+    if cached is not None:
+        return cached
+
+    # Satu GROUP BY dengan agregat kondisional menggantikan tiga query
+    # terpisah (count_by_user, count_unread_by_user, dan group-by per type)
+    rows = (
+        db.query(
+            Notification.type,
+            func.count(Notification.id).label("count"),
+            func.sum(case((Notification.read_at.is_(None), 1), else_=0)).label(
+                "unread"
+            ),
+        )
         .filter(Notification.notifiable_id == current_user.id)
         .group_by(Notification.type)
         .all()
     )
 
-    for type_name, count in type_results:
-        notifications_by_type[type_name] = count
+    total = sum(row.count for row in rows)
+    unread = sum(int(row.unread) for row in rows)
+    read = total - unread
+    notifications_by_type = {row.type: row.count for row in rows}
 
-    return NotificationStatsResponse(
+    stats = NotificationStatsResponse(
         total_notifications=total,
         unread_notifications=unread,
         read_notifications=read,
         notifications_by_type=notifications_by_type,
     )
+    _stats_cache.set(current_user.id, stats)
+
+    return stats
 
 
 @router.get(
@@ -252,14 +346,9 @@ def get_notification(
     if notification.notifiable_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Parse JSON data
-    try:
-        parsed_data = json.loads(notification.data)
-    except json.JSONDecodeError:
-        parsed_data = {}
-
+    # parsed_data dihasilkan oleh validator schema; jangan parse dua kali di sini
     return NotificationWithParsedData(
-        **notification.to_dict(), parsed_data=parsed_data, is_read=notification.is_read
+        **notification.to_dict(), is_read=notification.is_read
     )
 
 
@@ -280,25 +369,43 @@ def mark_notification_read(
     - **notification_id**: The ID of the notification
     - **is_read**: True to mark as read, False to mark as unread
     """
-    notification = (
-        db.query(Notification).filter(Notification.id == notification_id).first()
+    # Ownership masuk ke WHERE dari UPDATE: satu query tanpa menghidrasi
+    # kolom data yang besar. CASE menjaga read_at lama saat sudah read.
+    if mark_read.is_read:
+        values = {
+            Notification.read_at: case(
+                (Notification.read_at.is_(None), datetime.utcnow()),
+                else_=Notification.read_at,
+            )
+        }
+    else:
+        values = {Notification.read_at: None}
+
+    updated = (
+        db.query(Notification)
+        .filter(
+            Notification.id == notification_id,
+            Notification.notifiable_id == current_user.id,
+        )
+        .update(values, synchronize_session=False)
     )
-    if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
 
-    # Check if user owns this notification
-    if notification.notifiable_id != current_user.id:
+    if not updated:
+        # Hanya jalur error yang butuh query kedua, dan cuma satu kolom
+        owner = (
+            db.query(Notification.notifiable_id)
+            .filter(Notification.id == notification_id)
+            .scalar()
+        )
+        if owner is None:
+            raise HTTPException(status_code=404, detail="Notification not found")
         raise HTTPException(status_code=403, detail="Access denied")
 
-    if mark_read.is_read:
-        notification.mark_as_read()
-    else:
-        notification.mark_as_unread()
-
     db.commit()
-    db.refresh(notification)
 
-    return notification
+    _invalidate_user_caches(current_user.id)
+
+    return db.query(Notification).filter(Notification.id == notification_id).first()
 
 
 @router.put("/my/mark-all-read", summary="Mark all notifications as read")
@@ -312,6 +419,8 @@ def mark_all_notifications_read(
     updated_count = Notification.mark_all_read_by_user(db, current_user.id)
     db.commit()
 
+    _invalidate_user_caches(current_user.id)
+
     return {"message": f"Marked {updated_count} notifications as read"}
 
 
@@ -326,19 +435,31 @@ def delete_notification(
 
     - **notification_id**: The ID of the notification to delete
     """
-    notification = (
-        db.query(Notification).filter(Notification.id == notification_id).first()
+    # Ownership masuk ke WHERE dari DELETE: satu query tanpa hidrasi row
+    deleted = (
+        db.query(Notification)
+        .filter(
+            Notification.id == notification_id,
+            Notification.notifiable_id == current_user.id,
+        )
+        .delete(synchronize_session=False)
     )
-    if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
 
-    # Check if user owns this notification
-    if notification.notifiable_id != current_user.id:
+    if not deleted:
+        # Hanya jalur error yang butuh query kedua, dan cuma satu kolom
+        owner = (
+            db.query(Notification.notifiable_id)
+            .filter(Notification.id == notification_id)
+            .scalar()
+        )
+        if owner is None:
+            raise HTTPException(status_code=404, detail="Notification not found")
         raise HTTPException(status_code=403, detail="Access denied")
 
-    db.delete(notification)
     db.commit()
 
+    _invalidate_user_caches(current_user.id)
+
     return {"message": "Notification deleted successfully"}
 
 
@@ -353,6 +474,8 @@ def delete_read_notifications(
     deleted_count = Notification.delete_read_by_user(db, current_user.id)
     db.commit()
 
+    _invalidate_user_caches(current_user.id)
+
     return {"message": f"Deleted {deleted_count} read notifications"}
 
 
@@ -372,45 +495,55 @@ def bulk_mark_notifications_read(
 
     - **notification_ids**: List of notification IDs to mark as read
     """
-    success_count = 0
-    failed_count = 0
-    failed_items = []
-
-    for notification_id in bulk_request.notification_ids:
-        try:
-            notification = (
-                db.query(Notification)
-                .filter(Notification.id == notification_id)
-                .first()
-            )
-            if notification and notification.notifiable_id == current_user.id:
-                notification.mark_as_read()
-                success_count += 1
-            else:
-                failed_count += 1
-                failed_items.append(
-                    f"Notification {notification_id} not found or access denied"
-                )
-        except Exception as e:
-            failed_count += 1
-            failed_items.append(f"Notification {notification_id}: {str(e)}")
+    notification_ids = bulk_request.notification_ids
+
+    # Resolve ownership in one IN query instead of one SELECT per ID
+    owned_ids = {
+        row[0]
+        for row in db.query(Notification.id)
+        .filter(
+            Notification.id.in_(notification_ids),
+            Notification.notifiable_id == current_user.id,
+        )
+        .all()
+    }
+
+    total_requested = len(notification_ids)
+    failed_items = [
+        f"Notification {notification_id} not found or access denied"
+        for notification_id in notification_ids
+        if notification_id not in owned_ids
+    ]
+    success_count = len(owned_ids)
+    failed_count = total_requested - success_count
 
     try:
+        if owned_ids:
+            now = datetime.utcnow()
+            db.query(Notification).filter(
+                Notification.id.in_(owned_ids),
+                Notification.read_at.is_(None),
+            ).update(
+                {Notification.read_at: now, Notification.updated_at: now},
+                synchronize_session=False,
+            )
         db.commit()
     except Exception as e:
         db.rollback()
         return BulkOperationResponse(
             success_count=0,
-            failed_count=len(bulk_request.notification_ids),
-            total_requested=len(bulk_request.notification_ids),
+            failed_count=total_requested,
+            total_requested=total_requested,
             message="Bulk operation failed",
             failed_items=[f"Database error: {str(e)}"],
         )
 
+    _invalidate_user_caches(current_user.id)
+
     return BulkOperationResponse(
         success_count=success_count,
         failed_count=failed_count,
-        total_requested=len(bulk_request.notification_ids),
+        total_requested=total_requested,
         message=f"Bulk mark read completed: {success_count} successful, {failed_count} failed",
         failed_items=failed_items if failed_items else None,
     )
@@ -429,45 +562,50 @@ def bulk_delete_notifications(
 
     - **notification_ids**: List of notification IDs to delete
     """
-    success_count = 0
-    failed_count = 0
-    failed_items = []
-
-    for notification_id in bulk_request.notification_ids:
-        try:
-            notification = (
-                db.query(Notification)
-                .filter(Notification.id == notification_id)
-                .first()
-            )
-            if notification and notification.notifiable_id == current_user.id:
-                db.delete(notification)
-                success_count += 1
-            else:
-                failed_count += 1
-                failed_items.append(
-                    f"Notification {notification_id} not found or access denied"
-                )
-        except Exception as e:
-            failed_count += 1
-            failed_items.append(f"Notification {notification_id}: {str(e)}")
+    notification_ids = bulk_request.notification_ids
+
+    # Resolve ownership in one IN query instead of one SELECT per ID
+    owned_ids = {
+        row[0]
+        for row in db.query(Notification.id)
+        .filter(
+            Notification.id.in_(notification_ids),
+            Notification.notifiable_id == current_user.id,
+        )
+        .all()
+    }
+
+    total_requested = len(notification_ids)
+    failed_items = [
+        f"Notification {notification_id} not found or access denied"
+        for notification_id in notification_ids
+        if notification_id not in owned_ids
+    ]
+    success_count = len(owned_ids)
+    failed_count = total_requested - success_count
 
     try:
+        if owned_ids:
+            db.query(Notification).filter(Notification.id.in_(owned_ids)).delete(
+                synchronize_session=False
+            )
         db.commit()
     except Exception as e:
         db.rollback()
         return BulkOperationResponse(
             success_count=0,
-            failed_count=len(bulk_request.notification_ids),
-            total_requested=len(bulk_request.notification_ids),
+            failed_count=total_requested,
+            total_requested=total_requested,
             message="Bulk operation failed",
             failed_items=[f"Database error: {str(e)}"],
         )
 
+    _invalidate_user_caches(current_user.id)
+
     return BulkOperationResponse(
         success_count=success_count,
         failed_count=failed_count,
-        total_requested=len(bulk_request.notification_ids),
+        total_requested=total_requested,
         message=f"Bulk delete completed: {success_count} successful, {failed_count} failed",
         failed_items=failed_items if failed_items else None,
     )
@@ -492,25 +630,29 @@ def send_notification(
     - **action_url**: Optional action URL
     - **additional_data**: Optional additional data
     """
-    # Verify target user exists
-    target_user = db.query(User).filter(User.id == notification_send.user_id).first()
-    if not target_user:
+    # Verify target user exists (EXISTS, no need to hydrate the row)
+    user_exists = db.query(
+        db.query(User).filter(User.id == notification_send.user_id).exists()
+    ).scalar()
+    if not user_exists:
         raise HTTPException(status_code=404, detail="Target user not found")
 
     # Create notification data
     notification_data = notification_send.to_notification_data()
 
     db_notification = Notification(
-        id=str(uuid.uuid4()),
+        id=uuid7(),
         type=notification_send.type,
         notifiable_type="App\\Models\\User",
         notifiable_id=notification_send.user_id,
-        data=json.dumps(notification_data),
+        data=orjson.dumps(notification_data).decode(),
     )
 
     db.add(db_notification)
+    # expire_on_commit=False plus client-side defaults: no refresh needed
     db.commit()
-    db.refresh(db_notification)
+
+    _invalidate_user_caches(notification_send.user_id)
 
     return db_notification
 
@@ -522,6 +664,7 @@ def send_notification(
 )
 def send_bulk_notification(
     bulk_notification_send: BulkNotificationSend,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -535,49 +678,41 @@ def send_bulk_notification(
     - **action_url**: Optional action URL
     - **additional_data**: Optional additional data
     """
-    success_count = 0
-    failed_count = 0
-    failed_items = []
+    user_ids = bulk_notification_send.user_ids
 
-    # Create notification data
+    # Payload is identical for every recipient; serialize it once
     notification_data = bulk_notification_send.to_notification_data()
-
-    for user_id in bulk_notification_send.user_ids:
-        try:
-            # Verify user exists
-            target_user = db.query(User).filter(User.id == user_id).first()
-            if not target_user:
-                failed_count += 1
-                failed_items.append(f"User ID {user_id} not found")
-                continue
-
-            # Create notification
-            db_notification = Notification(
-                id=str(uuid.uuid4()),
-                type=bulk_notification_send.type,
-                notifiable_type="App\\Models\\User",
-                notifiable_id=user_id,
-                data=json.dumps(notification_data),
-            )
-
-            db.add(db_notification)
-            success_count += 1
-
-        except Exception as e:
-            failed_count += 1
-            failed_items.append(f"User ID {user_id}: {str(e)}")
-
-    try:
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        return BulkOperationResponse(
-            success_count=0,
-            failed_count=len(bulk_notification_send.user_ids),
-            total_requested=len(bulk_notification_send.user_ids),
-            message="Bulk notification send failed",
-            failed_items=[f"Database error: {str(e)}"],
-        )
+    payload = orjson.dumps(notification_data).decode()
+
+    # Validate all recipients in one IN query instead of one SELECT per user
+    valid_ids = {
+        row[0] for row in db.query(User.id).filter(User.id.in_(user_ids)).all()
+    }
+
+    failed_items = [
+        f"User ID {user_id} not found"
+        for user_id in user_ids
+        if user_id not in valid_ids
+    ]
+    success_count = len(valid_ids)
+    failed_count = len(user_ids) - success_count
+
+    rows = [
+        {
+            "id": uuid7(),
+            "type": bulk_notification_send.type,
+            "notifiable_type": "App\\Models\\User",
+            "notifiable_id": user_id,
+            "data": payload,
+        }
+        for user_id in user_ids
+        if user_id in valid_ids
+    ]
+
+    # The single multi-row INSERT runs after the response is sent, so large
+    # batches don't hold the request open while they commit
+    if rows:
+        background_tasks.add_task(_insert_notifications, rows, list(valid_ids))
 
     return BulkOperationResponse(
         success_count=success_count,
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session, raiseload, selectinload
 from typing import List, Optional
-import math
 
 from app.core.auth import get_current_user
-from app.core.permissions import require_role
-from ....config.database import get_db
+from app.core.cache import TTLCache
+from app.core.permissions import invalidate_permission_caches, require_role_dependency
+from ....config.database import get_db, insert_ignore
 from app.models.user import User
-from app.models.role import Role
+from app.models.role import Role, user_roles
 from app.models.permission import Permission, role_permissions
 from app.schemas.permission import (
     PermissionCreate,
@@ -26,13 +27,29 @@ from app.schemas.permission import (
 
 router = APIRouter()
 
+# Built once at import; per-request work on this hot lookup is just bind
+# parameter substitution, not query construction
+_PERMISSION_BY_ID = select(Permission).where(Permission.id == bindparam("permission_id"))
+
+# COUNT(*) over the whole table is a full scan on large tables; the total
+# changes rarely, so serve it from a short-lived cache between writes
+_count_cache = TTLCache(maxsize=1, ttl=30)
+
+
+def _count_all_cached(db: Session) -> int:
+    total = _count_cache.get("permissions")
+    if total is None:
+        total = Permission.count_all(db)
+        _count_cache.set("permissions", total)
+    return total
+
 
 @router.post("/", response_model=PermissionResponse, summary="Create new permission")
-@require_role("Admin")
 def create_permission(
     permission: PermissionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    _: None = Depends(require_role_dependency("Admin")),
 ):
     if Permission.get_by_slug(db, permission.slug):
         raise HTTPException(
@@ -48,6 +65,7 @@ def create_permission(
     db.add(db_permission)
     db.commit()
     db.refresh(db_permission)
+    _count_cache.pop("permissions")
 
     return db_permission
 
@@ -62,8 +80,9 @@ def get_permissions(
     skip = (page - 1) * per_page
 
     permissions = Permission.get_all_paginated(db, skip=skip, limit=per_page)
-    total = Permission.count_all(db)
-    total_pages = math.ceil(total / per_page)
+    total = _count_all_cached(db)
+    # Ceiling division without the float detour; per_page is validated >= 1
+    total_pages = -(-total // per_page)
 
     return PermissionListResponse(
         permissions=permissions,
@@ -90,11 +109,9 @@ def search_permissions(
         db, q, skip=skip, limit=per_page
     )
 
-    total_permissions = Permission.search_by_slug_or_description(
-        db, q, skip=0, limit=1000
-    )
-    total = len(total_permissions)
-    total_pages = math.ceil(total / per_page)
+    # Scalar COUNT(*) instead of fetching up to 1000 rows just for len()
+    total = Permission.count_by_slug_or_description(db, q)
+    total_pages = -(-total // per_page)
 
     return PermissionSearchResponse(
         permissions=permissions,
@@ -116,7 +133,9 @@ def get_permission(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    permission = db.query(Permission).filter(Permission.id == permission_id).first()
+    permission = db.execute(
+        _PERMISSION_BY_ID, {"permission_id": permission_id}
+    ).scalar_one_or_none()
     if not permission:
         raise HTTPException(status_code=404, detail="Permission not found")
 
@@ -126,12 +145,12 @@ def get_permission(
 @router.put(
     "/{permission_id}", response_model=PermissionResponse, summary="Update permission"
 )
-@require_role("Admin")
 def update_permission(
     permission_id: int,
     permission_update: PermissionUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    _: None = Depends(require_role_dependency("Admin")),
 ):
     permission = db.query(Permission).filter(Permission.id == permission_id).first()
     if not permission:
@@ -150,6 +169,8 @@ def update_permission(
 
     db.commit()
     db.refresh(permission)
+    # Rename pada slug mengubah hasil cek izin yang sudah ter-cache
+    invalidate_permission_caches()
 
     return permission
 
@@ -157,33 +178,47 @@ def update_permission(
 @router.delete(
     "/bulk", response_model=BulkPermissionResponse, summary="Bulk delete permissions"
 )
-@require_role("Admin")
 def bulk_delete_permissions(
     bulk_operation: BulkPermissionOperation,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    _: None = Depends(require_role_dependency("Admin")),
 ):
-    success_count = 0
-    failed_count = 0
-    failed_permissions = []
-
-    for permission_id in bulk_operation.permission_ids:
-        try:
-            permission = (
-                db.query(Permission).filter(Permission.id == permission_id).first()
-            )
-            if permission:
-                db.delete(permission)
-                success_count += 1
-            else:
-                failed_count += 1
-                failed_permissions.append(f"Permission ID {permission_id} not found")
-        except Exception as e:
-            failed_count += 1
-            failed_permissions.append(f"Permission ID {permission_id}: {str(e)}")
+    # One SELECT to find what exists, one DELETE ... WHERE IN for all of it,
+    # instead of a SELECT + DELETE pair per ID
+    found_ids = {
+        row[0]
+        for row in db.query(Permission.id)
+        .filter(Permission.id.in_(bulk_operation.permission_ids))
+        .all()
+    }
+    missing_ids = [
+        permission_id
+        for permission_id in bulk_operation.permission_ids
+        if permission_id not in found_ids
+    ]
+    failed_permissions = [
+        f"Permission ID {permission_id} not found" for permission_id in missing_ids
+    ]
+    success_count = len(found_ids)
+    failed_count = len(missing_ids)
 
     try:
+        if found_ids:
+            # role_permissions has no ON DELETE CASCADE, so the association
+            # rows go first in the same transaction; the per-ID ORM deletes
+            # this replaced did that cleanup implicitly
+            db.execute(
+                role_permissions.delete().where(
+                    role_permissions.c.permission_id.in_(found_ids)
+                )
+            )
+            db.query(Permission).filter(Permission.id.in_(found_ids)).delete(
+                synchronize_session=False
+            )
         db.commit()
+        _count_cache.pop("permissions")
+        invalidate_permission_caches()
     except Exception as e:
         db.rollback()
         return BulkPermissionResponse(
@@ -204,11 +239,11 @@ def bulk_delete_permissions(
 
 
 @router.delete("/{permission_id}", summary="Delete permission")
-@require_role("Admin")
 def delete_permission(
     permission_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    _: None = Depends(require_role_dependency("Admin")),
 ):
     permission = db.query(Permission).filter(Permission.id == permission_id).first()
     if not permission:
@@ -216,6 +251,8 @@ def delete_permission(
 
     db.delete(permission)
     db.commit()
+    _count_cache.pop("permissions")
+    invalidate_permission_caches()
 
     return {"message": "Permission deleted successfully"}
 
@@ -238,7 +275,8 @@ def assign_permissions_to_role(
     permissions = Permission.get_by_slugs(db, assignment.permission_slugs)
 
     if len(permissions) != len(assignment.permission_slugs):
-        found_slugs = [p.slug for p in permissions]
+        # Set membership keeps this O(N+M) instead of rescanning a list
+        found_slugs = {p.slug for p in permissions}
         missing_slugs = [
             slug for slug in assignment.permission_slugs if slug not in found_slugs
         ]
@@ -246,13 +284,23 @@ def assign_permissions_to_role(
             status_code=404, detail=f"Permissions not found: {', '.join(missing_slugs)}"
         )
 
-    for permission in permissions:
-        if permission not in role.permissions:
-            role.permissions.append(permission)
+    # One idempotent executemany INSERT; the composite primary key plus
+    # IGNORE makes re-assignment a no-op without a pre-SELECT, and it's
+    # safe under concurrent assigns
+    if permissions:
+        db.execute(
+            insert_ignore(role_permissions),
+            [
+                {"role_id": role.id, "permission_id": permission.id}
+                for permission in permissions
+            ],
+        )
 
     db.commit()
-    db.refresh(role)
+    invalidate_permission_caches()
 
+    # role.permissions was never loaded pre-commit, so this lazy load pulls
+    # the fresh association rows; no refresh round trip needed
     return RolePermissionResponse(
         role_id=role.id,
         role_name=role.name,
@@ -279,13 +327,21 @@ def unassign_permissions_from_role(
 
     permissions = Permission.get_by_slugs(db, unassignment.permission_slugs)
 
-    for permission in permissions:
-        if permission in role.permissions:
-            role.permissions.remove(permission)
+    if permissions:
+        db.execute(
+            role_permissions.delete().where(
+                role_permissions.c.role_id == role.id,
+                role_permissions.c.permission_id.in_(
+                    [permission.id for permission in permissions]
+                ),
+            )
+        )
 
     db.commit()
-    db.refresh(role)
+    invalidate_permission_caches()
 
+    # role.permissions was never loaded pre-commit, so this lazy load pulls
+    # the fresh association rows; no refresh round trip needed
     return RolePermissionResponse(
         role_id=role.id,
         role_name=role.name,
@@ -305,7 +361,13 @@ def get_role_permissions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    role = db.query(Role).filter(Role.id == role_id).first()
+    # Eager-load the permissions in one extra query instead of a lazy load
+    role = (
+        db.query(Role)
+        .options(selectinload(Role.permissions))
+        .filter(Role.id == role_id)
+        .first()
+    )
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
 
@@ -329,26 +391,34 @@ def check_user_permission(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    user_exists = db.query(
+        db.query(User.id).filter(User.id == user_id).exists()
+    ).scalar()
+    if not user_exists:
         raise HTTPException(status_code=404, detail="User not found")
 
     permission = Permission.get_by_slug(db, permission_slug)
     if not permission:
         raise HTTPException(status_code=404, detail="Permission not found")
 
-    granted_via_roles = []
-    has_permission = False
-
-    for role in user.roles:
-        if permission in role.permissions:
-            has_permission = True
-            granted_via_roles.append(role.name)
+    # One indexed join over the association tables resolves both the grant
+    # and which roles carry it, instead of walking the ORM graph in Python
+    rows = (
+        db.query(Role.name)
+        .join(role_permissions, role_permissions.c.role_id == Role.id)
+        .join(user_roles, user_roles.c.role_id == Role.id)
+        .filter(
+            user_roles.c.user_id == user_id,
+            role_permissions.c.permission_id == permission.id,
+        )
+        .all()
+    )
+    granted_via_roles = [name for (name,) in rows]
 
     return UserPermissionResponse(
-        user_id=user.id,
+        user_id=user_id,
         permission_slug=permission_slug,
-        has_permission=has_permission,
+        has_permission=bool(granted_via_roles),
         granted_via_roles=granted_via_roles,
     )
 
@@ -363,13 +433,22 @@ def get_user_permissions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    # Eager-load roles and their permissions so the comprehension below
+    # does no per-role lazy loads; raiseload turns any path this forgot
+    # into a loud error instead of a silent extra SELECT
+    user = (
+        db.query(User)
+        .options(
+            selectinload(User.roles).selectinload(Role.permissions), raiseload("*")
+        )
+        .filter(User.id == user_id)
+        .first()
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user_permissions = set()
-    for role in user.roles:
-        for permission in role.permissions:
-            user_permissions.add(permission)
+    user_permissions = {
+        permission for role in user.roles for permission in role.permissions
+    }
 
     return list(user_permissions)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session, raiseload, selectinload
 from typing import List
 
-from app.models.role import Role
+from app.models.role import Role, user_roles
 from app.models.user import User
 from app.schemas.role import (
     RoleResponse,
@@ -15,14 +16,19 @@ from app.schemas.role import (
     BulkRoleUnassign,
     UserRoleCheck,
 )
-from app.config.database import get_db
+from app.config.database import get_db, insert_ignore
 from app.core.auth import get_current_user
+from app.core.permissions import invalidate_permission_caches
 
 router = APIRouter()
 
+# Built once at import; per-request work on this hot lookup is just bind
+# parameter substitution, not query construction
+_ROLE_BY_ID = select(Role).where(Role.id == bindparam("role_id"))
+
 
 @router.get("/", response_model=List[RoleResponse])
-async def get_roles(
+def get_roles(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -33,19 +39,23 @@ async def get_roles(
 
 
 @router.post("/", response_model=RoleResponse, status_code=status.HTTP_201_CREATED)
-async def create_role(
+def create_role(
     role_data: RoleCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    existing_role = db.query(Role).filter(Role.name == role_data.name).first()
-    if existing_role:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Role name already exists"
-        )
-
-    existing_slug = db.query(Role).filter(Role.slug == role_data.slug).first()
-    if existing_slug:
+    # One round trip covers both uniqueness checks; branch on which matched
+    existing = (
+        db.query(Role.name, Role.slug)
+        .filter((Role.name == role_data.name) | (Role.slug == role_data.slug))
+        .first()
+    )
+    if existing:
+        if existing.name == role_data.name:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Role name already exists",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Role slug already exists"
         )
@@ -59,7 +69,7 @@ async def create_role(
 
 
 @router.get("/search")
-async def search_roles(
+def search_roles(
     q: str = "",
     page: int = 1,
     per_page: int = 10,
@@ -71,17 +81,27 @@ async def search_roles(
     if q:
         query = query.filter(Role.name.contains(q) | Role.description.contains(q))
 
+    # Scalar COUNT(*) for the total before paginating
+    total = query.with_entities(func.count(Role.id)).scalar()
     roles = query.offset((page - 1) * per_page).limit(per_page).all()
-    return {"roles": roles, "search_term": q, "page": page, "per_page": per_page}
+    # Preconstructed dicts skip jsonable_encoder's reflection over ORM
+    # objects; orjson then encodes them directly
+    return {
+        "roles": [role.to_dict() for role in roles],
+        "total": total,
+        "search_term": q,
+        "page": page,
+        "per_page": per_page,
+    }
 
 
 @router.get("/{role_id}", response_model=RoleResponse)
-async def get_role(
+def get_role(
     role_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    role = db.query(Role).filter(Role.id == role_id).first()
+    role = db.execute(_ROLE_BY_ID, {"role_id": role_id}).scalar_one_or_none()
 
     if not role:
         raise HTTPException(
@@ -92,7 +112,7 @@ async def get_role(
 
 
 @router.put("/{role_id}", response_model=RoleResponse)
-async def update_role(
+def update_role(
     role_id: int,
     role_data: RoleUpdate,
     db: Session = Depends(get_db),
@@ -140,7 +160,7 @@ async def update_role(
 
 
 @router.delete("/{role_id}")
-async def delete_role(
+def delete_role(
     role_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -152,7 +172,12 @@ async def delete_role(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    users_count = len(role.users)
+    # Scalar COUNT on the association table instead of hydrating every user
+    users_count = (
+        db.query(func.count(user_roles.c.user_id))
+        .filter(user_roles.c.role_id == role_id)
+        .scalar()
+    )
     if users_count > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -161,12 +186,13 @@ async def delete_role(
 
     db.delete(role)
     db.commit()
+    invalidate_permission_caches()
 
     return {"message": "Role deleted successfully", "deleted_role_id": role_id}
 
 
 @router.post("/assign", status_code=status.HTTP_200_OK)
-async def assign_role_to_user(
+def assign_role_to_user(
     assignment: UserRoleAssign,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -183,13 +209,22 @@ async def assign_role_to_user(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    if role in user.roles:
+    # Indexed PK lookup on the association table instead of loading the
+    # whole roles collection for a membership test
+    already_assigned = db.query(
+        db.query(user_roles)
+        .filter(user_roles.c.user_id == user.id, user_roles.c.role_id == role.id)
+        .exists()
+    ).scalar()
+    if already_assigned:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User already has this role"
         )
 
-    user.roles.append(role)
+    # IGNORE closes the race between the check above and the insert
+    db.execute(insert_ignore(user_roles).values(user_id=user.id, role_id=role.id))
     db.commit()
+    invalidate_permission_caches()
 
     return {
         "message": f"Role '{role.name}' assigned to user '{user.name}'",
@@ -199,7 +234,7 @@ async def assign_role_to_user(
 
 
 @router.post("/unassign", status_code=status.HTTP_200_OK)
-async def unassign_role_from_user(
+def unassign_role_from_user(
     unassignment: UserRoleUnassign,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -216,14 +251,22 @@ async def unassign_role_from_user(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    if role not in user.roles:
+    # Delete the association row directly; rowcount tells us whether the
+    # user actually had the role without loading the collection
+    result = db.execute(
+        user_roles.delete().where(
+            user_roles.c.user_id == user.id, user_roles.c.role_id == role.id
+        )
+    )
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User does not have this role",
         )
 
-    user.roles.remove(role)
     db.commit()
+    invalidate_permission_caches()
 
     return {
         "message": f"Role '{role.name}' removed from user '{user.name}'",
@@ -233,12 +276,19 @@ async def unassign_role_from_user(
 
 
 @router.get("/user/{user_id}", response_model=UserWithRoles)
-async def get_user_roles(
+def get_user_roles(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    # Eager-load the roles the response serializes; raiseload turns any
+    # other lazy access into a loud error instead of a silent extra SELECT
+    user = (
+        db.query(User)
+        .options(selectinload(User.roles), raiseload("*"))
+        .filter(User.id == user_id)
+        .first()
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -248,7 +298,7 @@ async def get_user_roles(
 
 
 @router.post("/check", response_model=UserRoleCheck)
-async def check_user_has_role(
+def check_user_has_role(
     user_id: int,
     role_name: str,
     db: Session = Depends(get_db),
@@ -266,7 +316,11 @@ async def check_user_has_role(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    has_role = role in user.roles
+    has_role = db.query(
+        db.query(user_roles)
+        .filter(user_roles.c.user_id == user.id, user_roles.c.role_id == role.id)
+        .exists()
+    ).scalar()
 
     return UserRoleCheck(
         user_id=user.id, role_name=role.name, role_slug=role.slug, has_role=has_role
@@ -274,7 +328,7 @@ async def check_user_has_role(
 
 
 @router.post("/assign/bulk", status_code=status.HTTP_200_OK)
-async def bulk_assign_role(
+def bulk_assign_role(
     bulk_assignment: BulkRoleAssign,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -285,57 +339,71 @@ async def bulk_assign_role(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    users = db.query(User).filter(User.id.in_(bulk_assignment.user_ids)).all()
-    if len(users) != len(bulk_assignment.user_ids):
+    found_count = (
+        db.query(func.count(User.id))
+        .filter(User.id.in_(bulk_assignment.user_ids))
+        .scalar()
+    )
+    if found_count != len(bulk_assignment.user_ids):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Some users not found"
         )
 
+    # One idempotent executemany INSERT; IGNORE skips pairs that already
+    # exist and rowcount reports how many were actually added
     assigned_count = 0
-    for user in users:
-        if role not in user.roles:
-            user.roles.append(role)
-            assigned_count += 1
-
+    if bulk_assignment.user_ids:
+        result = db.execute(
+            insert_ignore(user_roles),
+            [
+                {"user_id": user_id, "role_id": role.id}
+                for user_id in bulk_assignment.user_ids
+            ],
+        )
+        assigned_count = result.rowcount
     db.commit()
+    invalidate_permission_caches()
 
     return {
         "message": f"Role '{role.name}' assigned to {assigned_count} users",
         "role_id": role.id,
         "assigned_user_count": assigned_count,
-        "total_users": len(users),
+        "total_users": found_count,
     }
 
 
 # Additional endpoints to match test expectations
 @router.get("/user/{user_id}/roles")
-async def get_user_roles_list(
+def get_user_roles_list(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get roles assigned to a user - matches test expectation"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User.id).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
+    # Project just the columns the response uses instead of hydrating
+    # full Role objects through the lazy relationship
+    roles = (
+        db.query(Role.id, Role.name, Role.slug, Role.description)
+        .join(user_roles, user_roles.c.role_id == Role.id)
+        .filter(user_roles.c.user_id == user_id)
+        .all()
+    )
     return {
         "roles": [
-            {
-                "id": role.id,
-                "name": role.name,
-                "slug": role.slug,
-                "description": role.description,
-            }
-            for role in user.roles
+            {"id": role_id, "name": name, "slug": slug, "description": description}
+            for role_id, name, slug, description in roles
         ]
     }
 
 
 @router.get("/{role_id}/users")
-async def get_role_users_list(
+def get_role_users_list(
     role_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -347,16 +415,24 @@ async def get_role_users_list(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
+    # Project just the columns the response uses instead of hydrating
+    # full User objects through the lazy relationship
+    users = (
+        db.query(User.id, User.name, User.email)
+        .join(user_roles, user_roles.c.user_id == User.id)
+        .filter(user_roles.c.role_id == role_id)
+        .all()
+    )
     return {
         "users": [
-            {"id": user.id, "name": user.name, "email": user.email}
-            for user in role.users
+            {"id": user_id, "name": name, "email": email}
+            for user_id, name, email in users
         ]
     }
 
 
 @router.get("/check/{user_id}/{role_name}")
-async def check_user_role_by_get(
+def check_user_role_by_get(
     user_id: int,
     role_name: str,
     db: Session = Depends(get_db),
@@ -375,12 +451,16 @@ async def check_user_role_by_get(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    has_role = role in user.roles
+    has_role = db.query(
+        db.query(user_roles)
+        .filter(user_roles.c.user_id == user.id, user_roles.c.role_id == role.id)
+        .exists()
+    ).scalar()
     return {"has_role": has_role, "role_name": role.name, "user_id": user.id}
 
 
 @router.post("/bulk/assign")
-async def bulk_assign_roles_alt(
+def bulk_assign_roles_alt(
     bulk_assignment: BulkRoleAssign,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -392,22 +472,26 @@ async def bulk_assign_roles_alt(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    users = db.query(User).filter(User.id.in_(bulk_assignment.user_ids)).all()
+    found_ids = [
+        row[0]
+        for row in db.query(User.id).filter(User.id.in_(bulk_assignment.user_ids)).all()
+    ]
 
     success_count = 0
-    failed_count = 0
-
-    for user in users:
-        if role not in user.roles:
-            user.roles.append(role)
-            success_count += 1
+    if found_ids:
+        result = db.execute(
+            insert_ignore(user_roles),
+            [{"user_id": user_id, "role_id": role.id} for user_id in found_ids],
+        )
+        success_count = result.rowcount
 
     db.commit()
-    return {"success_count": success_count, "failed_count": failed_count}
+    invalidate_permission_caches()
+    return {"success_count": success_count, "failed_count": 0}
 
 
 @router.post("/bulk/unassign")
-async def bulk_unassign_roles_alt(
+def bulk_unassign_roles_alt(
     bulk_assignment: BulkRoleUnassign,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -419,15 +503,23 @@ async def bulk_unassign_roles_alt(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
 
-    users = db.query(User).filter(User.id.in_(bulk_assignment.user_ids)).all()
-
-    success_count = 0
-    failed_count = 0
-
-    for user in users:
-        if role in user.roles:
-            user.roles.remove(role)
-            success_count += 1
+    existing_ids = [
+        row[0]
+        for row in db.query(user_roles.c.user_id)
+        .filter(
+            user_roles.c.role_id == role.id,
+            user_roles.c.user_id.in_(bulk_assignment.user_ids),
+        )
+        .all()
+    ]
+    if existing_ids:
+        db.execute(
+            user_roles.delete().where(
+                user_roles.c.role_id == role.id,
+                user_roles.c.user_id.in_(existing_ids),
+            )
+        )
 
     db.commit()
-    return {"success_count": success_count, "failed_count": failed_count}
+    invalidate_permission_caches()
+    return {"success_count": len(existing_ids), "failed_count": 0}
@@ -1,41 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Session
-from typing import List
-from passlib.context import CryptContext
+from typing import List, Optional
 
+from app.models.role import user_roles
 from app.models.user import User
 from app.schemas.user import UserResponse, UserCreate, UserUpdate, UserLogin
 from app.config.database import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, get_password_hash, verify_password
+from app.core.cache import TTLCache
 
 router = APIRouter()
 
+# Columns the list/search responses actually use; keeps the password hash
+# and 2FA secrets out of the SELECT and the serialized payload. Fetched as
+# plain row mappings - the endpoints only serialize, so full User instances
+# would pay identity-map and dirty-tracking costs for nothing
+_USER_LIST_COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    User.email_verified_at,
+    User.created_at,
+    User.updated_at,
+)
+_USER_LIST_SELECT = select(*_USER_LIST_COLUMNS)
+
+# Built once at import; per-request work on this hot lookup is just bind
+# parameter substitution, not query construction
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+# The stats dashboard polls this; a 30s-stale total beats a full COUNT(*)
+# scan per poll. Writers invalidate below
+_user_count_cache = TTLCache(maxsize=1, ttl=30)
+
+
+def _keyset_page(db: Session, stmt, cursor: int, per_page: int):
+    """Satu halaman keyset: seek lewat PK, bukan OFFSET yang membuang baris."""
+    rows = (
+        db.execute(stmt.where(User.id > cursor).order_by(User.id).limit(per_page + 1))
+        .mappings()
+        .all()
+    )
+    # Kursor berikutnya = id terakhir yang DIKEMBALIKAN; seek berikutnya
+    # pakai id > cursor, jadi baris ekstra tidak boleh jadi kursor
+    next_cursor = rows[per_page - 1]["id"] if len(rows) > per_page else None
+    return rows[:per_page], next_cursor
+
 
 @router.get("/")
 def get_users(
-    page: int = 1,
-    per_page: int = 10,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    cursor: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    users = db.query(User).offset((page - 1) * per_page).limit(per_page).all()
+    # Cursor clients get keyset pagination; deep OFFSET pages scan and
+    # discard every preceding row, a seek on id does not
+    if cursor is not None:
+        users, next_cursor = _keyset_page(db, _USER_LIST_SELECT, cursor, per_page)
+        return {"users": users, "per_page": per_page, "next_cursor": next_cursor}
+
+    users = (
+        db.execute(
+            _USER_LIST_SELECT.order_by(User.id)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        .mappings()
+        .all()
+    )
     return {"users": users, "page": page, "per_page": per_page}
 
 
 @router.get("/search")
 def search_users(
     q: str = "",
-    page: int = 1,
-    per_page: int = 10,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    cursor: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Search users by name or email"""
-    query = db.query(User)
-    if q:
-        query = query.filter(User.name.contains(q) | User.email.contains(q))
+    # Single-character terms match nearly every row and can't use any
+    # substring index; refuse them instead of scanning the whole table
+    if q and len(q) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search term must be at least 2 characters",
+        )
 
-    users = query.offset((page - 1) * per_page).limit(per_page).all()
+    stmt = _USER_LIST_SELECT
+    if q:
+        stmt = stmt.where(User.name.contains(q) | User.email.contains(q))
+
+    if cursor is not None:
+        users, next_cursor = _keyset_page(db, stmt, cursor, per_page)
+        return {
+            "users": users,
+            "search_term": q,
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+        }
+
+    users = (
+        db.execute(
+            stmt.order_by(User.id).offset((page - 1) * per_page).limit(per_page)
+        )
+        .mappings()
+        .all()
+    )
     return {"users": users, "search_term": q, "page": page, "per_page": per_page}
 
 
@@ -53,7 +129,10 @@ def get_user_stats(
     current_user: User = Depends(get_current_user),
 ):
     """Get user statistics"""
-    total_users = db.query(User).count()
+    total_users = _user_count_cache.get("users")
+    if total_users is None:
+        total_users = db.query(User).count()
+        _user_count_cache.set("users", total_users)
     # For now, assume all users are active (placeholder logic)
     active_users = total_users
 
@@ -71,17 +150,15 @@ def change_password(
     current_user: User = Depends(get_current_user),
 ):
     """Change current user's password"""
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
     # Verify current password
-    if not pwd_context.verify(password_data["current_password"], current_user.password):
+    if not verify_password(password_data["current_password"], current_user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
     # Hash new password
-    hashed_password = pwd_context.hash(password_data["new_password"])
+    hashed_password = get_password_hash(password_data["new_password"])
     current_user.password = hashed_password
 
     db.commit()
@@ -97,19 +174,28 @@ def bulk_delete_users(
     """Bulk delete users"""
     user_ids = user_data.get("user_ids", [])
 
+    # One set-based DELETE instead of a SELECT + DELETE pair per ID; the
+    # self-exclusion folds into the WHERE (don't allow deleting self) and
+    # rowcount says how many rows actually went away. user_role has no ON
+    # DELETE CASCADE, so the association rows go first in the same
+    # transaction
     success_count = 0
-    failed_count = 0
-
-    for user_id in user_ids:
-        user = db.query(User).filter(User.id == user_id).first()
-        if user and user.id != current_user.id:  # Don't allow deleting self
-            db.delete(user)
-            success_count += 1
-        else:
-            failed_count += 1
+    if user_ids:
+        db.execute(
+            user_roles.delete().where(
+                user_roles.c.user_id.in_(user_ids),
+                user_roles.c.user_id != current_user.id,
+            )
+        )
+        success_count = (
+            db.query(User)
+            .filter(User.id.in_(user_ids), User.id != current_user.id)
+            .delete(synchronize_session=False)
+        )
 
     db.commit()
-    return {"success_count": success_count, "failed_count": failed_count}
+    _user_count_cache.pop("users")
+    return {"success_count": success_count, "failed_count": len(user_ids) - success_count}
 
 
 @router.put("/profile", response_model=UserResponse)
@@ -122,18 +208,18 @@ def update_user_profile(
     if user_data.name:
         current_user.name = user_data.name
     if user_data.email:
-        # Check if email already exists for another user (case insensitive)
-        from sqlalchemy import func
-
-        existing_user = (
-            db.query(User)
+        # Check if email already exists for another user (case insensitive);
+        # lowercasing the candidate in Python keeps the predicate on the
+        # lower(email) index, and EXISTS skips hydrating a User row
+        email_taken = db.query(
+            db.query(User.id)
             .filter(
-                func.lower(User.email) == func.lower(user_data.email),
+                func.lower(User.email) == user_data.email.lower(),
                 User.id != current_user.id,
             )
-            .first()
-        )
-        if existing_user:
+            .exists()
+        ).scalar()
+        if email_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
@@ -151,7 +237,7 @@ def get_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(_USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -165,27 +251,29 @@ def create_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Case-insensitive email check
-    from sqlalchemy import func
-
-    existing_user = (
-        db.query(User)
-        .filter(func.lower(User.email) == func.lower(user_data.email))
-        .first()
-    )
-    if existing_user:
+    # Case-insensitive email check; EXISTS stops at the first match and
+    # skips ORM hydration
+    email_taken = db.query(
+        db.query(User.id)
+        .filter(func.lower(User.email) == user_data.email.lower())
+        .exists()
+    ).scalar()
+    if email_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = get_password_hash(user_data.password)
 
-    db_user = User(name=user_data.name, email=user_data.email, password=hashed_password)
+    # Store email normalized so equality lookups can use the plain email index
+    db_user = User(
+        name=user_data.name, email=user_data.email.lower(), password=hashed_password
+    )
 
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    _user_count_cache.pop("users")
 
     return db_user
 
@@ -216,15 +304,17 @@ def update_user(
     if user_data.name is not None:
         user.name = user_data.name
     if user_data.email is not None:
-        # Check for duplicate email (case insensitive)
-        from sqlalchemy import func
-
-        existing_user = (
-            db.query(User)
-            .filter(func.lower(User.email) == func.lower(user_data.email))
-            .first()
-        )
-        if existing_user and existing_user.id != user_id:
+        # Check for duplicate email (case insensitive); the id exclusion
+        # folds into the EXISTS predicate
+        email_taken = db.query(
+            db.query(User.id)
+            .filter(
+                func.lower(User.email) == user_data.email.lower(),
+                User.id != user_id,
+            )
+            .exists()
+        ).scalar()
+        if email_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
@@ -243,15 +333,9 @@ def delete_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
     # Check permission: only admin can delete users
-    user_roles = [role.name.lower() for role in current_user.roles]
-    is_admin = "admin" in user_roles
+    role_names = [role.name.lower() for role in current_user.roles]
+    is_admin = "admin" in role_names
 
     if not is_admin:
         raise HTTPException(
@@ -259,8 +343,25 @@ def delete_user(
             detail="Admin role required to delete users",
         )
 
-    db.delete(user)
+    # user_role has no ON DELETE CASCADE and the bulk DELETE below skips
+    # the ORM's secondary-table cleanup, so clear the association rows in
+    # the same transaction first
+    db.execute(user_roles.delete().where(user_roles.c.user_id == user_id))
+
+    # One DELETE whose rowcount doubles as the existence check; no point
+    # hydrating the row first just to hand it back to the session (MySQL
+    # has no DELETE ... RETURNING to fold the two together)
+    deleted = (
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+    )
+    if not deleted:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
     db.commit()
+    _user_count_cache.pop("users")
 
     return {"message": "User deleted successfully"}
 
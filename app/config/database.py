@@ -20,13 +20,49 @@ else:
     DB_PORT = os.getenv("DB_PORT", "3306")
     DB_NAME = os.getenv("DB_NAME", "db_dcs")
 
+    # Pool sizing - defaults (5 + 10 overflow) lock up under concurrent load.
+    # pre_ping revalidates checked-out connections so MySQL's idle timeout
+    # doesn't surface as "server has gone away"; recycle stays below it
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
     DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        # Bulk inserts (notification fan-out) batch into multi-row VALUES
+        # statements of up to this many rows per round trip
+        insertmanyvalues_page_size=10_000,
+    )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The engine stays synchronous by design: every endpoint is a plain def
+# that FastAPI runs in its threadpool, so requests don't block the event
+# loop, and pymysql has no asyncio driver mode to migrate to anyway
+# expire_on_commit=False keeps attributes loaded after commit; columns use
+# client-side defaults, so handlers can return freshly inserted objects
+# without a refresh SELECT (MySQL has no INSERT ... RETURNING)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 Base = declarative_base()
 
 
+def insert_ignore(table):
+    """INSERT that silently skips rows hitting a unique constraint.
+
+    MySQL spells it INSERT IGNORE and SQLite (tests) INSERT OR IGNORE;
+    Core has no dialect-neutral form, so pick the prefix from the engine.
+    """
+    prefix = "OR IGNORE" if engine.dialect.name == "sqlite" else "IGNORE"
+    return table.insert().prefix_with(prefix)
+
+
 def get_db():
     db = SessionLocal()
     try:
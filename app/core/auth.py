@@ -1,5 +1,14 @@
 import bcrypt
-from datetime import datetime, timedelta
+import hashlib
+import hmac
+import time
+
+try:
+    from argon2 import PasswordHasher
+    from argon2 import exceptions as argon2_exceptions
+except ImportError:
+    PasswordHasher = None
+from datetime import timedelta
 import jwt
 from jwt.exceptions import PyJWTError
 from typing import Optional
@@ -7,8 +16,11 @@ import os
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app.config.database import get_db
+from app.core.cache import TTLCache
+from app.models.role import Role
+from app.models.user import User
 
 load_dotenv()
 
@@ -19,27 +31,68 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 security = HTTPBearer()
 
 
+# Argon2id per OWASP baseline (19 MiB, 2 iterations, one lane): memory-hard
+# defense comparable to bcrypt at lower per-hash CPU. bcrypt remains the
+# fallback scheme when argon2-cffi isn't installed, and legacy bcrypt
+# hashes always stay verifiable
+_argon2 = (
+    PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+    if PasswordHasher is not None
+    else None
+)
+
+
+# The endpoints that call these are plain def, so FastAPI runs them in its
+# threadpool and the argon2/bcrypt C cores release the GIL while they work -
+# the event loop never stalls on a hash
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
-    )
+    if _argon2 is not None and hashed_password.startswith("$argon2"):
+        try:
+            return _argon2.verify(hashed_password, plain_password)
+        except (
+            argon2_exceptions.VerificationError,
+            argon2_exceptions.InvalidHashError,
+        ):
+            return False
+
+    # Re-hash the candidate with the stored salt and compare the digests in
+    # constant time so the comparison never leaks a matching prefix length
+    expected = hashed_password.encode("utf-8")
+    candidate = bcrypt.hashpw(plain_password.encode("utf-8"), expected)
+    return hmac.compare_digest(expected, candidate)
 
 
 def get_password_hash(password: str) -> str:
+    if _argon2 is not None:
+        return _argon2.hash(password)
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Apakah hash tersimpan perlu di-upgrade ke skema/parameter terkini."""
+    if _argon2 is None:
+        return False
+    if not hashed_password.startswith("$argon2"):
+        return True
+    return _argon2.check_needs_rehash(hashed_password)
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+
+# Hashed once at import; login verifies against this when the email doesn't
+# match a user so unknown and known accounts cost the same bcrypt work
+DUMMY_PASSWORD_HASH = get_password_hash("invalid-password-placeholder")
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    # time.time() skips the deprecated datetime.utcnow() plus the timedelta
+    # arithmetic; JWT exp is an int epoch anyway, so encode gets it directly
+    seconds = (
+        expires_delta.total_seconds()
+        if expires_delta
+        else ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+    to_encode = {**data, "exp": int(time.time() + seconds)}
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def verify_token(token: str):
@@ -59,35 +112,88 @@ def verify_token(token: str):
         return None
 
 
-async def get_current_user(
+class TokenUser:
+    """Lightweight current user built from validated JWT claims only.
+
+    Login stores both the user id and email in the token, so handlers that
+    only need current_user.id / .email can skip the per-request User SELECT
+    that get_current_user performs.
+    """
+
+    __slots__ = ("id", "email")
+
+    def __init__(self, id: int, email: Optional[str] = None):
+        self.id = id
+        self.email = email
+
+
+# Validated claims per token, keyed by a short digest so the cache never
+# stores raw bearer tokens; expiry is still enforced on every hit
+_payload_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+async def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> dict:
+    """Decode and validate the bearer token once per request.
+
+    FastAPI caches dependency results within a request, so everything that
+    needs the claims (current user, refresh handler) shares one decode.
+    Across requests the claims come from a short TTL cache, skipping the
+    HMAC verification for tokens seen recently.
+    """
+    key = hashlib.blake2b(
+        credentials.credentials.encode("utf-8"), digest_size=16
+    ).digest()
+    payload = _payload_cache.get(key)
+    if payload is not None:
+        # Cheap int compare replaces the HMAC verify; drop expired entries
+        # eagerly instead of letting them linger until the TTL sweeps them
+        if payload["exp"] > time.time():
+            return payload
+        _payload_cache.pop(key)
+
+    payload = verify_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    _payload_cache.set(key, payload)
+    return payload
+
+
+async def get_token_user(payload: dict = Depends(get_token_payload)) -> TokenUser:
+    # Login writes sub as str(user.id); cast once here so .id always
+    # compares equal to integer PKs regardless of how the token was minted
+    return TokenUser(id=int(payload["sub"]), email=payload.get("email"))
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
     db: Session = Depends(get_db),
 ):
-    from app.models.user import User
-
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        token = credentials.credentials
-
-        payload = verify_token(token)
-        if payload is None:
-            raise credentials_exception
-
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-
-    except HTTPException:
-        raise
-    except Exception as e:
+    user_id: int = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Admin checks and the permission decorators walk current_user.roles
+    # (and their permissions); two selectin queries up front beat the
+    # 1 + N + N*M lazy loads they'd otherwise trigger
+    user = (
+        db.query(User)
+        .options(selectinload(User.roles).selectinload(Role.permissions))
+        .filter(User.id == user_id)
+        .first()
+    )
     if user is None:
         raise credentials_exception
 
@@ -0,0 +1,57 @@
+"""Small in-process TTL cache for hot, rarely-changing reads."""
+
+import time
+from threading import Lock
+
+# Every cache registers itself here so the test suite can reset all cached
+# state between cases (tables are rebuilt per test and ids get reused)
+_instances = []
+
+
+def clear_all_caches():
+    """Empty every TTLCache instance; used by the test fixtures."""
+    for cache in _instances:
+        cache.clear()
+
+
+class TTLCache:
+    """Dict-backed cache where entries expire after a fixed TTL.
+
+    Per-process only: each worker keeps its own copy, so writers must
+    invalidate explicitly via pop(). When the cache is full the entry
+    closest to expiry is evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}  # key -> (expires_at, value)
+        self._lock = Lock()
+        _instances.append(self)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < now:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
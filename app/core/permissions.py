@@ -1,296 +1,22 @@
-from functools import wraps
-import inspect
 from fastapi import HTTPException, Depends
 from sqlalchemy.orm import Session
-from typing import List, Callable, Any
+from typing import List
 from app.core.auth import get_current_user
+from app.core.cache import TTLCache
 from ..config.database import get_db
 from app.models.user import User
-from app.models.permission import Permission
+from app.models.role import user_roles
+from app.models.permission import Permission, role_permissions
 
+# Keputusan izin dan daftar role berubah jarang; cache 30 detik membuang
+# satu round trip DB per request yang didekorasi. Endpoint mutasi role/
+# permission wajib memanggil invalidate_permission_caches()
+_decision_cache = TTLCache(maxsize=100_000, ttl=30)
 
-def require_permission(permission_slug: str):
-    """
-    Decorator untuk mengharuskan user memiliki permission tertentu.
-
-    Args:
-        permission_slug: Slug permission yang dibutuhkan
-
-    Returns:
-        Decorated function yang akan check permission
-
-    Usage:
-        @require_permission("users.create")
-        @router.post("/users")
-        def create_user(...):
-            pass
-    """
-
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Extract dependencies dari kwargs
-            current_user = None
-            db = None
-
-            # Cari current_user dan db dari kwargs
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                elif hasattr(value, "query"):  # Session object
-                    db = value
-
-            if not current_user:
-                raise HTTPException(status_code=401, detail="Authentication required")
-
-            if not db:
-                raise HTTPException(
-                    status_code=500, detail="Database session not available"
-                )
-
-            # Check permission
-            if not check_user_has_permission(db, current_user.id, permission_slug):
-                raise HTTPException(
-                    status_code=403, detail=f"Permission '{permission_slug}' required"
-                )
-
-            # Call original function
-            if inspect.iscoroutinefunction(func):
-                return await func(*args, **kwargs)
-            else:
-                return func(*args, **kwargs)
-
-        return wrapper
-
-    return decorator
-
-
-def require_any_permission(permission_slugs: List[str]):
-    """
-    Decorator untuk mengharuskan user memiliki minimal satu dari beberapa permission.
-
-    Args:
-        permission_slugs: List permission slugs, user hanya perlu punya salah satu
-
-    Returns:
-        Decorated function yang akan check permissions
-
-    Usage:
-        @require_any_permission(["users.create", "admin.all"])
-        @router.post("/users")
-        def create_user(...):
-            pass
-    """
-
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Extract dependencies dari kwargs
-            current_user = None
-            db = None
-
-            # Cari current_user dan db dari kwargs
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                elif hasattr(value, "query"):  # Session object
-                    db = value
-
-            if not current_user:
-                raise HTTPException(status_code=401, detail="Authentication required")
-
-            if not db:
-                raise HTTPException(
-                    status_code=500, detail="Database session not available"
-                )
-
-            # Check if user has any of the required permissions
-            has_permission = False
-            for permission_slug in permission_slugs:
-                if check_user_has_permission(db, current_user.id, permission_slug):
-                    has_permission = True
-                    break
-
-            if not has_permission:
-                raise HTTPException(
-                    status_code=403,
-                    detail=f"One of these permissions required: {', '.join(permission_slugs)}",
-                )
-
-            # Call original function
-            if inspect.iscoroutinefunction(func):
-                return await func(*args, **kwargs)
-            else:
-                return func(*args, **kwargs)
-
-        return wrapper
-
-    return decorator
-
-
-def require_all_permissions(permission_slugs: List[str]):
-    """
-    Decorator untuk mengharuskan user memiliki semua permission yang disebutkan.
-
-    Args:
-        permission_slugs: List permission slugs yang semuanya harus dimiliki user
-
-    Returns:
-        Decorated function yang akan check permissions
-
-    Usage:
-        @require_all_permissions(["users.create", "users.assign_role"])
-        @router.post("/users")
-        def create_user_with_role(...):
-            pass
-    """
-
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Extract dependencies dari kwargs
-            current_user = None
-            db = None
-
-            # Cari current_user dan db dari kwargs
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                elif hasattr(value, "query"):  # Session object
-                    db = value
-
-            if not current_user:
-                raise HTTPException(status_code=401, detail="Authentication required")
 
-            if not db:
-                raise HTTPException(
-                    status_code=500, detail="Database session not available"
-                )
-
-            # Check if user has all required permissions
-            missing_permissions = []
-            for permission_slug in permission_slugs:
-                if not check_user_has_permission(db, current_user.id, permission_slug):
-                    missing_permissions.append(permission_slug)
-
-            if missing_permissions:
-                raise HTTPException(
-                    status_code=403,
-                    detail=f"Missing required permissions: {', '.join(missing_permissions)}",
-                )
-
-            # Call original function
-            if inspect.iscoroutinefunction(func):
-                return await func(*args, **kwargs)
-            else:
-                return func(*args, **kwargs)
-
-        return wrapper
-
-    return decorator
-
-
-def require_role(role_name: str):
-    """
-    Decorator untuk mengharuskan user memiliki role tertentu.
-
-    Args:
-        role_name: Nama role yang dibutuhkan
-
-    Returns:
-        Decorated function yang akan check role
-
-    Usage:
-        @require_role("admin")
-        @router.post("/admin/users")
-        def create_user_admin(...):
-            pass
-    """
-
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Extract dependencies dari kwargs
-            current_user = None
-
-            # Cari current_user dari kwargs
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                    break
-
-            if not current_user:
-                raise HTTPException(status_code=401, detail="Authentication required")
-
-            # Check role
-            user_roles = [role.name for role in current_user.roles]
-            if role_name not in user_roles:
-                raise HTTPException(
-                    status_code=403, detail=f"Role '{role_name}' required"
-                )
-
-            # Call original function
-            if inspect.iscoroutinefunction(func):
-                return await func(*args, **kwargs)
-            else:
-                return func(*args, **kwargs)
-
-        return wrapper
-
-    return decorator
-
-
-def require_any_role(role_names: List[str]):
-    """
-    Decorator untuk mengharuskan user memiliki minimal satu dari beberapa role.
-
-    Args:
-        role_names: List role names, user hanya perlu punya salah satu
-
-    Returns:
-        Decorated function yang akan check roles
-
-    Usage:
-        @require_any_role(["admin", "moderator"])
-        @router.post("/moderate")
-        def moderate_content(...):
-            pass
-    """
-
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Extract dependencies dari kwargs
-            current_user = None
-
-            # Cari current_user dari kwargs
-            for key, value in kwargs.items():
-                if isinstance(value, User):
-                    current_user = value
-                    break
-
-            if not current_user:
-                raise HTTPException(status_code=401, detail="Authentication required")
-
-            # Check roles
-            user_roles = [role.name for role in current_user.roles]
-            has_role = any(role_name in user_roles for role_name in role_names)
-
-            if not has_role:
-                raise HTTPException(
-                    status_code=403,
-                    detail=f"One of these roles required: {', '.join(role_names)}",
-                )
-
-            # Call original function
-            if inspect.iscoroutinefunction(func):
-                return await func(*args, **kwargs)
-            else:
-                return func(*args, **kwargs)
-
-        return wrapper
-
-    return decorator
+def invalidate_permission_caches():
+    """Buang semua keputusan izin yang tersimpan setelah mutasi role/permission."""
+    _decision_cache.clear()
 
 
 # Helper functions
@@ -306,20 +32,22 @@ def check_user_has_permission(db: Session, user_id: int, permission_slug: str) -
     Returns:
         True jika user punya permission, False jika tidak
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return False
-
-    permission = Permission.get_by_slug(db, permission_slug)
-    if not permission:
-        return False
-
-    # Check semua roles user
-    for role in user.roles:
-        if permission in role.permissions:
-            return True
+    cached = _decision_cache.get((user_id, permission_slug))
+    if cached is not None:
+        return cached
 
-    return False
+    # Satu query join lewat tabel asosiasi; LIMIT 1 berhenti di baris
+    # pertama yang cocok tanpa menghidrasi objek ORM sama sekali
+    row = (
+        db.query(user_roles.c.user_id)
+        .join(role_permissions, role_permissions.c.role_id == user_roles.c.role_id)
+        .join(Permission, Permission.id == role_permissions.c.permission_id)
+        .filter(user_roles.c.user_id == user_id, Permission.slug == permission_slug)
+        .first()
+    )
+    has_permission = row is not None
+    _decision_cache.set((user_id, permission_slug), has_permission)
+    return has_permission
 
 
 def get_user_permissions(db: Session, user_id: int) -> List[str]:
@@ -333,16 +61,17 @@ def get_user_permissions(db: Session, user_id: int) -> List[str]:
     Returns:
         List permission slugs yang dimiliki user
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return []
-
-    permission_slugs = set()
-    for role in user.roles:
-        for permission in role.permissions:
-            permission_slugs.add(permission.slug)
-
-    return list(permission_slugs)
+    # DISTINCT slug lewat join asosiasi; tidak perlu memuat user, roles,
+    # dan permissions sebagai objek ORM hanya untuk mengumpulkan slug
+    rows = (
+        db.query(Permission.slug)
+        .distinct()
+        .join(role_permissions, role_permissions.c.permission_id == Permission.id)
+        .join(user_roles, user_roles.c.role_id == role_permissions.c.role_id)
+        .filter(user_roles.c.user_id == user_id)
+        .all()
+    )
+    return [slug for (slug,) in rows]
 
 
 def get_user_roles(db: Session, user_id: int) -> List[str]:
@@ -356,11 +85,17 @@ def get_user_roles(db: Session, user_id: int) -> List[str]:
     Returns:
         List role names yang dimiliki user
     """
+    cached = _decision_cache.get(("roles", user_id))
+    if cached is not None:
+        return list(cached)
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         return []
 
-    return [role.name for role in user.roles]
+    role_names = [role.name for role in user.roles]
+    _decision_cache.set(("roles", user_id), tuple(role_names))
+    return role_names
 
 
 # FastAPI dependency functions
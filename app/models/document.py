@@ -7,9 +7,10 @@ from sqlalchemy import (
     ForeignKey,
     Text,
     Enum,
+    Index,
 )
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
 import enum
 from app.config.database import Base
 
@@ -39,11 +40,11 @@ class Document(Base):
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
         nullable=False,
     )
 
@@ -76,6 +77,13 @@ class Document(Base):
 
 class DocumentRevision(Base):
     __tablename__ = "document_revisions"
+    __table_args__ = (
+        # Serves the latest-revision lookup and duplicate revision_number
+        # checks without scanning all of a document's revisions
+        Index(
+            "ix_document_revisions_document_revnum", "document_id", "revision_number"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
@@ -87,11 +95,11 @@ class DocumentRevision(Base):
     acc_content = Column(Integer, nullable=True)
     status = Column(Enum(RevisionStatus), default=RevisionStatus.DRAFT, nullable=False)
     revised_doc = Column(String(255), nullable=True)  # Revised document filename/path
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
         nullable=False,
     )
 
@@ -131,6 +139,16 @@ class HistoryAction(enum.Enum):
 
 class DocumentHistory(Base):
     __tablename__ = "document_history"
+    __table_args__ = (
+        # Supports the filtered/grouped queries in the history endpoints
+        # (per-document listing and the analytics summary)
+        Index(
+            "ix_document_history_document_created_action",
+            "document_id",
+            "created_at",
+            "action",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
@@ -138,11 +156,11 @@ class DocumentHistory(Base):
     action = Column(Enum(HistoryAction), nullable=False)
     performed_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     reason = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
         nullable=False,
     )
 
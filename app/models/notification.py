@@ -1,16 +1,75 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Text,
+    ForeignKey,
+    Index,
+    case,
+    func,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import secrets
+import time
+import uuid
+
 from app.config.database import Base
 
 
+def uuid7() -> str:
+    """UUID v7 string: millisecond timestamp in the high bits, random tail.
+
+    Random v4 ids land on arbitrary B-tree pages, fragmenting the primary
+    key index as the table grows; v7 ids are time-ordered so inserts append
+    to the right edge like an autoincrement would, while staying plain
+    36-char UUID strings for every existing caller.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    value = (
+        (ts_ms << 80)
+        | (0x7 << 76)
+        | (secrets.randbits(12) << 64)
+        | (0b10 << 62)
+        | secrets.randbits(62)
+    )
+    return str(uuid.UUID(int=value))
+
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Every hot query filters on notifiable_id and then either orders by
+        # created_at or filters on read_at; composite indexes avoid a
+        # filesort / full scan per page (MySQL has no partial indexes, so the
+        # unread lookup indexes read_at itself)
+        Index("ix_notifications_user_created", "notifiable_id", "created_at"),
+        # created_at as the trailing column lets the unread list come back
+        # already ordered and the unread count run index-only
+        Index(
+            "ix_notifications_user_read_created",
+            "notifiable_id",
+            "read_at",
+            "created_at",
+        ),
+        # Lets the per-type stats GROUP BY run as an index-only scan
+        Index("ix_notifications_user_type", "notifiable_id", "type"),
+        # Retention cleanup deletes by read_at + created_at across all users
+        Index("ix_notifications_read_created", "read_at", "created_at"),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
     type = Column(String(255), nullable=False)
-    notifiable_type = Column(String(255), nullable=False, default="App\\Models\\User")
+    # Laravel-style polymorphic tag; only User exists today. Kept as a string
+    # for wire compatibility, but sized to the values it actually holds so
+    # temp tables and sort buffers stop reserving 255 utf8mb4 chars per row
+    notifiable_type = Column(String(50), nullable=False, default="App\\Models\\User")
     notifiable_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Serialized JSON payload. Deliberately Text rather than MySQL's JSON
+    # type: the API contract exposes data as a string, nothing filters on
+    # fields inside it, and JSON columns would re-parse/normalize every
+    # write for no read-side benefit here
     data = Column(Text, nullable=False)
     read_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -115,13 +174,48 @@ class Notification(Base):
             .all()
         )
 
+    @classmethod
+    def get_inbox_page(cls, db_session, user_id: int, skip: int = 0, limit: int = 100):
+        """One windowed query for inbox views: page rows plus both counts.
+
+        Replaces the get_by_user + count_by_user + count_unread_by_user
+        trio (three round-trips) with COUNT/SUM OVER () on the same scan.
+        Returns (notifications, total, unread).
+        """
+        rows = (
+            db_session.query(
+                cls,
+                func.count().over().label("total"),
+                func.sum(case((cls.read_at.is_(None), 1), else_=0))
+                .over()
+                .label("unread"),
+            )
+            .filter(cls.notifiable_id == user_id)
+            .order_by(cls.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        if rows:
+            return [row[0] for row in rows], rows[0].total, int(rows[0].unread)
+        # Empty page (inbox empty or skip past the end): the window saw no
+        # rows, so the counts need their own queries
+        return (
+            [],
+            cls.count_by_user(db_session, user_id),
+            cls.count_unread_by_user(db_session, user_id),
+        )
+
     @classmethod
     def mark_all_read_by_user(cls, db_session, user_id: int):
+        # updated_at stays explicit: bulk update() bypasses the ORM onupdate
+        # hook. synchronize_session=False skips the per-row identity-map
+        # evaluation the default would do for loaded instances
         now = datetime.utcnow()
         return (
             db_session.query(cls)
             .filter(cls.notifiable_id == user_id, cls.read_at.is_(None))
-            .update({"read_at": now, "updated_at": now})
+            .update({"read_at": now, "updated_at": now}, synchronize_session=False)
         )
 
     @classmethod
@@ -129,5 +223,5 @@ class Notification(Base):
         return (
             db_session.query(cls)
             .filter(cls.notifiable_id == user_id, cls.read_at.is_not(None))
-            .delete()
+            .delete(synchronize_session=False)
         )
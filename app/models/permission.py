@@ -1,6 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Table, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Text,
+    Table,
+    ForeignKey,
+    Index,
+    bindparam,
+    func,
+    select,
+)
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
 from app.config.database import Base
 
 role_permissions = Table(
@@ -8,13 +20,16 @@ role_permissions = Table(
     Base.metadata,
     Column("role_id", Integer, ForeignKey("roles.id"), primary_key=True),
     Column("permission_id", Integer, ForeignKey("permissions.id"), primary_key=True),
-    Column("created_at", DateTime, default=datetime.now(timezone.utc)),
+    Column("created_at", DateTime, default=datetime.utcnow),
     Column(
         "updated_at",
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     ),
+    # The composite PK covers role->permissions; this serves the reverse
+    # direction (all roles granting a permission) without a table scan
+    Index("ix_role_permissions_permission_role", "permission_id", "role_id"),
 )
 
 
@@ -24,11 +39,11 @@ class Permission(Base):
     id = Column(Integer, primary_key=True, index=True)
     slug = Column(String(191), nullable=False, unique=True)
     description = Column(String(191), nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
         nullable=False,
     )
 
@@ -50,7 +65,9 @@ class Permission(Base):
 
     @classmethod
     def get_by_slug(cls, db_session, slug: str):
-        return db_session.query(cls).filter(cls.slug == slug).first()
+        return db_session.execute(
+            _PERMISSION_BY_SLUG, {"slug": slug}
+        ).scalar_one_or_none()
 
     @classmethod
     def get_by_slugs(cls, db_session, slugs: list):
@@ -64,6 +81,17 @@ class Permission(Base):
     def count_all(cls, db_session):
         return db_session.query(cls).count()
 
+    @classmethod
+    def count_by_slug_or_description(cls, db_session, search_term: str):
+        search_pattern = f"%{search_term}%"
+        return (
+            db_session.query(func.count(cls.id))
+            .filter(
+                (cls.slug.like(search_pattern)) | (cls.description.like(search_pattern))
+            )
+            .scalar()
+        )
+
     @classmethod
     def search_by_slug_or_description(
         cls, db_session, search_term: str, skip: int = 0, limit: int = 100
@@ -78,3 +106,8 @@ class Permission(Base):
             .limit(limit)
             .all()
         )
+
+
+# Built once at import so the hot slug lookup only substitutes the bind
+# parameter per call
+_PERMISSION_BY_SLUG = select(Permission).where(Permission.slug == bindparam("slug"))
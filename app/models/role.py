@@ -1,6 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Table, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Text,
+    Table,
+    ForeignKey,
+    Index,
+)
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
 from app.config.database import Base
 
 user_roles = Table(
@@ -8,13 +17,16 @@ user_roles = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
     Column("role_id", Integer, ForeignKey("roles.id"), primary_key=True),
-    Column("created_at", DateTime, default=datetime.now(timezone.utc)),
+    Column("created_at", DateTime, default=datetime.utcnow),
     Column(
         "updated_at",
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     ),
+    # The composite PK covers user->roles; this serves the reverse
+    # direction (all users of a role) without a table scan
+    Index("ix_user_role_role_user", "role_id", "user_id"),
 )
 
 
@@ -25,11 +37,11 @@ class Role(Base):
     name = Column(String(191), nullable=False, unique=True)
     slug = Column(String(191), nullable=False, unique=True)
     description = Column(String(191), nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
         nullable=False,
     )
 
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, func
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from datetime import datetime
 from app.config.database import Base
 
 
@@ -10,17 +10,21 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     email = Column(String(255), unique=True, nullable=False, index=True)
+
+    # Functional index so case-insensitive lookups (login, duplicate checks)
+    # stay on an index scan instead of a per-row lower()/ILIKE table scan
+    __table_args__ = (Index("ix_users_email_lower", func.lower(email)),)
     password = Column(String(255), nullable=False)
     email_verified_at = Column(DateTime, nullable=True)
     remember_token = Column(String(100), nullable=True)
     two_factor_secret = Column(Text, nullable=True)
     two_factor_recovery_codes = Column(Text, nullable=True)
     two_factor_confirmed_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     )
 
     uploaded_documents = relationship(
@@ -2,7 +2,10 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Union
 import json
-import uuid
+
+from app.models.notification import uuid7
+
+import orjson
 
 
 class NotificationBase(BaseModel):
@@ -11,7 +14,7 @@ class NotificationBase(BaseModel):
     )
     notifiable_type: str = Field(
         default="App\\Models\\User",
-        max_length=255,
+        max_length=50,
         description="Type of notifiable entity",
     )
     notifiable_id: int = Field(
@@ -45,7 +48,7 @@ class NotificationCreate(NotificationBase):
     @field_validator("id", mode="before")
     @classmethod
     def set_id(cls, v):
-        return v or str(uuid.uuid4())
+        return v or uuid7()
 
 
 class NotificationUpdate(BaseModel):
@@ -94,13 +97,14 @@ class NotificationResponse(BaseModel):
 
 
 class NotificationWithParsedData(NotificationResponse):
-    parsed_data: Dict[str, Any]
+    # Filled by the validator below; callers only supply the raw data string
+    parsed_data: Dict[str, Any] = Field(default_factory=dict)
 
     @model_validator(mode="after")
     def parse_json_data(self):
         try:
-            self.parsed_data = json.loads(self.data)
-        except json.JSONDecodeError:
+            self.parsed_data = orjson.loads(self.data)
+        except orjson.JSONDecodeError:
             self.parsed_data = {}
         return self
 
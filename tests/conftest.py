@@ -21,6 +21,7 @@ from app.models.category import Category
 from app.models.document import Document
 from app.models.notification import Notification
 from app.core.auth import get_password_hash, create_access_token
+from app.core.cache import clear_all_caches
 from app.main import app
 
 
@@ -44,6 +45,17 @@ def get_test_db():
         db.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Empty the in-process TTL caches before each test.
+
+    Tables are rebuilt per test and ids get reused, so cached counts and
+    permission decisions from one case must never leak into the next.
+    """
+    clear_all_caches()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test"""
@@ -488,3 +488,55 @@ class TestNotificationEndpoints:
             uuid_valid = False
 
         assert uuid_valid is True
+
+
+class TestUnreadCountCache:
+    """Test class for the in-process unread badge cache"""
+
+    def test_unread_cache_hit_and_invalidation(
+        self, client, authenticated_user, test_user, db_session
+    ):
+        """Cached unread counts survive direct writes, write endpoints invalidate"""
+        from app.api.v1.endpoints.notification import _unread_cache
+
+        create_test_notification(db_session, test_user.id)
+
+        # The filtered list path reads the unread count through the cache;
+        # the first call misses and seeds it
+        response = client.get(
+            "/api/v1/notifications/my?is_read=false",
+            headers=authenticated_user["headers"],
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["unread_count"] == 1
+        assert _unread_cache.get(test_user.id) == 1
+
+        # A write the cache can't see: the page shows both rows but the
+        # badge count is served from the cache (the hit path)
+        create_test_notification(db_session, test_user.id)
+        response = client.get(
+            "/api/v1/notifications/my?is_read=false",
+            headers=authenticated_user["headers"],
+        )
+        data = response.json()
+        assert len(data["notifications"]) == 2
+        assert data["unread_count"] == 1
+
+        # Writes that go through the API invalidate; the next read recounts
+        response = client.post(
+            "/api/v1/notifications/",
+            json={
+                "type": "cache_test",
+                "notifiable_id": test_user.id,
+                "data": {"title": "Cache", "message": "Invalidation"},
+            },
+            headers=authenticated_user["headers"],
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert _unread_cache.get(test_user.id) is None
+
+        response = client.get(
+            "/api/v1/notifications/my?is_read=false",
+            headers=authenticated_user["headers"],
+        )
+        assert response.json()["unread_count"] == 3
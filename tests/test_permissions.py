@@ -6,6 +6,10 @@ import pytest
 import json
 from fastapi import status
 
+from app.core.permissions import (
+    check_user_has_permission,
+    invalidate_permission_caches,
+)
 from app.models.permission import Permission
 from app.models.role import Role
 from app.models.user import User
@@ -410,3 +414,37 @@ class TestPermissionEndpoints:
             headers=authenticated_admin["headers"],
         )
         assert response.status_code == status.HTTP_200_OK
+
+
+class TestPermissionDecisionCache:
+    """Test class for the in-process permission decision cache"""
+
+    def test_decision_cache_hit_and_invalidation(
+        self, db_session, test_user, test_role, test_permission
+    ):
+        """Cached decisions are served until a write invalidates them"""
+        test_role.permissions.append(test_permission)
+        test_user.roles.append(test_role)
+        db_session.commit()
+
+        assert (
+            check_user_has_permission(db_session, test_user.id, test_permission.slug)
+            is True
+        )
+
+        # Remove the assignment behind the cache's back: the stale positive
+        # decision keeps being served from the cache
+        test_user.roles.remove(test_role)
+        db_session.commit()
+        assert (
+            check_user_has_permission(db_session, test_user.id, test_permission.slug)
+            is True
+        )
+
+        # Role/permission mutation endpoints call this; the next check goes
+        # back to the database and sees the revocation
+        invalidate_permission_caches()
+        assert (
+            check_user_has_permission(db_session, test_user.id, test_permission.slug)
+            is False
+        )
@@ -378,3 +378,47 @@ class TestUserEndpoints:
             user1_ids = [user["id"] for user in data1["users"]]
             user2_ids = [user["id"] for user in data2["users"]]
             assert set(user1_ids).isdisjoint(set(user2_ids))
+
+
+class TestUserKeysetPagination:
+    """Test class for the cursor-based user list pagination"""
+
+    def test_cursor_pages_match_offset_pages(
+        self, client, authenticated_admin, sample_users
+    ):
+        """Walking by cursor yields the same ids as walking by offset"""
+        headers = authenticated_admin["headers"]
+
+        offset_ids = []
+        for page in range(1, 20):
+            data = client.get(
+                f"/api/v1/users/?page={page}&per_page=2", headers=headers
+            ).json()
+            if not data["users"]:
+                break
+            offset_ids.extend(user["id"] for user in data["users"])
+
+        cursor_ids = []
+        cursor = 0
+        for _ in range(20):
+            data = client.get(
+                f"/api/v1/users/?cursor={cursor}&per_page=2", headers=headers
+            ).json()
+            cursor_ids.extend(user["id"] for user in data["users"])
+            if data["next_cursor"] is None:
+                break
+            cursor = data["next_cursor"]
+        else:
+            pytest.fail("next_cursor never terminated")
+
+        assert cursor_ids == offset_ids
+        assert len(cursor_ids) >= len(sample_users)
+
+    def test_search_single_character_term_rejected(self, client, authenticated_admin):
+        """One-character search terms are refused with 400"""
+        response = client.get(
+            "/api/v1/users/search?q=a", headers=authenticated_admin["headers"]
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "at least 2 characters" in response.json()["detail"]